@@ -2,11 +2,65 @@ import cv2
 import numpy as np
 import pickle
 import math
+import os
+import queue
+import sys
+import threading
 import time
 
+# Direction labels indexed by x_code + 3 * y_code
+# (x_code: 0 none, 1 right, 2 left; y_code: 0 none, 1 bottom, 2 top)
+_DIR_TABLE = ['Centered', 'Right', 'Left',
+              'Bottom', 'RightBottom', 'LeftBottom',
+              'Top', 'RightTop', 'LeftTop']
+
+# Vertical spacing between overlay text lines in pixels
+_LINE_HEIGHT = 16
+
+# Color of the centering grid lines (BGR)
+_GRID_COLOR = (100, 100, 100)
+
+def _make_params():
+    """Build detector parameters tuned for better detection"""
+    params = cv2.aruco.DetectorParameters()
+    params.adaptiveThreshWinSizeMin = 3
+    params.adaptiveThreshWinSizeMax = 23
+    params.adaptiveThreshWinSizeStep = 10
+    params.adaptiveThreshConstant = 7
+    params.minMarkerPerimeterRate = 0.03
+    params.maxMarkerPerimeterRate = 4.0
+    params.polygonalApproxAccuracyRate = 0.03
+    params.minCornerDistanceRate = 0.05
+    params.minDistanceToBorder = 3
+    params.minMarkerDistanceRate = 0.05
+    return params
+
+# Dictionaries and parameters are stateless, so they are built once and
+# shared by every detector instance (e.g. detect_from_image over a folder)
+_DETECTOR_PARAMS = _make_params()
+_ARUCO_DICTS = {}
+_DETECTORS = {}
+
+def _get_dictionary(dictionary_type):
+    """Return the cached predefined dictionary for dictionary_type"""
+    aruco_dict = _ARUCO_DICTS.get(dictionary_type)
+    if aruco_dict is None:
+        aruco_dict = cv2.aruco.getPredefinedDictionary(dictionary_type)
+        _ARUCO_DICTS[dictionary_type] = aruco_dict
+    return aruco_dict
+
+def _get_detector(dictionary_type):
+    """Return the cached ArucoDetector for dictionary_type"""
+    detector = _DETECTORS.get(dictionary_type)
+    if detector is None:
+        detector = cv2.aruco.ArucoDetector(_get_dictionary(dictionary_type), _DETECTOR_PARAMS)
+        _DETECTORS[dictionary_type] = detector
+    return detector
+
 class ArUcoDetector:
     def __init__(self, calibration_file="camera_calibration.pkl", 
-                 dictionary_type=cv2.aruco.DICT_6X6_250, marker_size=50.0):
+                 dictionary_type=cv2.aruco.DICT_6X6_250, marker_size=50.0,
+                 render=True, needs_pose=True):
         """
         Initialize ArUco marker detector
         
@@ -14,40 +68,65 @@ class ArUcoDetector:
             calibration_file: path to camera calibration file
             dictionary_type: ArUco dictionary type
             marker_size: actual size of markers in mm
+            render: if False, draw_markers_and_pose leaves the frame untouched
+            needs_pose: if False, detect_and_track skips pose estimation
         """
         self.dictionary_type = dictionary_type
         self.marker_size = marker_size  # in mm
+        self.render = render
+        self.needs_pose = needs_pose
         
         # Load camera calibration
         self.load_calibration(calibration_file)
         
-        # Create ArUco dictionary and detector parameters
-        self.aruco_dict = cv2.aruco.getPredefinedDictionary(dictionary_type)
-        self.detector_params = cv2.aruco.DetectorParameters()
-        
-        # Optimize detector parameters for better detection
-        self.detector_params.adaptiveThreshWinSizeMin = 3
-        self.detector_params.adaptiveThreshWinSizeMax = 23
-        self.detector_params.adaptiveThreshWinSizeStep = 10
-        self.detector_params.adaptiveThreshConstant = 7
-        self.detector_params.minMarkerPerimeterRate = 0.03
-        self.detector_params.maxMarkerPerimeterRate = 4.0
-        self.detector_params.polygonalApproxAccuracyRate = 0.03
-        self.detector_params.minCornerDistanceRate = 0.05
-        self.detector_params.minDistanceToBorder = 3
-        self.detector_params.minMarkerDistanceRate = 0.05
-        
-        # Create detector
-        self.detector = cv2.aruco.ArucoDetector(self.aruco_dict, self.detector_params)
+        # Shared ArUco dictionary, detector parameters and detector
+        self.aruco_dict = _get_dictionary(dictionary_type)
+        self.detector = _get_detector(dictionary_type)
+        self.detector_params = _DETECTOR_PARAMS
+        
+        # Persistent grayscale buffers reused across frames
+        self._gray = None
+        self._gray_u = None
+        self._gray_u_shape = None
+        
+        # Run thresholding through OpenCL (Transparent API) when available
+        self.use_opencl = cv2.ocl.haveOpenCL()
+        
+        # Frame geometry constants keyed on (height, width)
+        self._shape_cache = {}
+        
+        # Console output is rate limited so printing does not stall detection
+        self.log_interval = 0.5  # seconds
+        self._last_log_t = 0.0
+        
+        # Marker corner model in the order required by SOLVEPNP_IPPE_SQUARE
+        half = marker_size / 2.0
+        self._obj_pts = np.array([[-half, half, 0],
+                                  [half, half, 0],
+                                  [half, -half, 0],
+                                  [-half, -half, 0]], dtype=np.float32)
         
     def load_calibration(self, calibration_file):
-        """Load camera calibration parameters"""
+        """
+        Load camera calibration parameters
+        
+        A NumPy .npz file next to calibration_file (same base name) is
+        preferred; pickle is only used as a fallback for legacy files.
+        """
+        npz_file = os.path.splitext(calibration_file)[0] + '.npz'
         try:
-            with open(calibration_file, 'rb') as f:
-                calibration_data = pickle.load(f)
+            if os.path.exists(npz_file):
+                calibration_file = npz_file
+                with np.load(npz_file) as npz_data:
+                    calibration_data = {'camera_matrix': npz_data['camera_matrix'],
+                                        'dist_coeffs': npz_data['dist_coeffs']}
+            else:
+                with open(calibration_file, 'rb') as f:
+                    calibration_data = pickle.load(f)
             
-            self.camera_matrix = calibration_data['camera_matrix']
-            self.dist_coeffs = calibration_data['dist_coeffs']
+            # Cast once to contiguous float32 so OpenCV never recasts per call
+            self.camera_matrix = np.ascontiguousarray(calibration_data['camera_matrix'], dtype=np.float32)
+            self.dist_coeffs = np.ascontiguousarray(calibration_data['dist_coeffs'], dtype=np.float32)
             self.calibrated = True
             print(f"Camera calibration loaded from: {calibration_file}")
             
@@ -70,10 +149,38 @@ class ArUcoDetector:
             ids: detected marker IDs
             rejected: rejected marker candidates
         """
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.use_opencl:
+            return self._detect_markers_opencl(frame)
+        
+        if frame.ndim == 2:
+            # Already single channel (e.g. Y plane), no conversion needed
+            gray = frame
+        else:
+            if self._gray is None or self._gray.shape != frame.shape[:2]:
+                self._gray = np.empty(frame.shape[:2], dtype=np.uint8)
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
         corners, ids, rejected = self.detector.detectMarkers(gray)
         return corners, ids, rejected
     
+    def _detect_markers_opencl(self, frame):
+        """Detect markers on a UMat so OpenCV can offload work to OpenCL"""
+        frame_u = cv2.UMat(frame)
+        if frame.ndim == 2:
+            gray_u = frame_u
+        else:
+            if self._gray_u is None or self._gray_u_shape != frame.shape[:2]:
+                self._gray_u = cv2.UMat(frame.shape[0], frame.shape[1], cv2.CV_8UC1)
+                self._gray_u_shape = frame.shape[:2]
+            gray_u = cv2.cvtColor(frame_u, cv2.COLOR_BGR2GRAY, dst=self._gray_u)
+        
+        corners, ids, rejected = self.detector.detectMarkers(gray_u)
+        
+        # Outputs come back as UMat, convert to arrays for the CPU pose/drawing code
+        corners = tuple(c.get() for c in corners)
+        ids = ids.get() if corners else None
+        rejected = tuple(r.get() for r in rejected)
+        return corners, ids, rejected
+    
     def estimate_pose(self, corners, ids):
         """
         Estimate pose of detected markers
@@ -89,9 +196,18 @@ class ArUcoDetector:
         if not self.calibrated or ids is None:
             return None, None
             
-        # Estimate pose for each marker
-        rvecs, tvecs, _ = cv2.aruco.estimatePoseSingleMarkers(
-            corners, self.marker_size, self.camera_matrix, self.dist_coeffs)
+        # Estimate pose for each marker (IPPE_SQUARE is closed form for planar squares)
+        image_points = np.concatenate(corners, axis=0).reshape(-1, 4, 2).astype(np.float32, copy=False)
+        n = len(image_points)
+        rvecs = np.empty((n, 1, 3), dtype=np.float64)
+        tvecs = np.empty((n, 1, 3), dtype=np.float64)
+        for i in range(n):
+            # Solutions are sorted by reprojection error, keep the best one
+            _, rvec_sols, tvec_sols, _ = cv2.solvePnPGeneric(
+                self._obj_pts, image_points[i], self.camera_matrix, self.dist_coeffs,
+                flags=cv2.SOLVEPNP_IPPE_SQUARE)
+            rvecs[i, 0] = rvec_sols[0].ravel()
+            tvecs[i, 0] = tvec_sols[0].ravel()
         
         return rvecs, tvecs
     
@@ -108,7 +224,8 @@ class ArUcoDetector:
             angles: orientation angles (roll, pitch, yaw) in degrees
         """
         # Distance is the magnitude of translation vector
-        distance = np.linalg.norm(tvec)
+        t = tvec.ravel()
+        distance = math.sqrt(t[0] * t[0] + t[1] * t[1] + t[2] * t[2])
         
         # Convert rotation vector to rotation matrix
         rmat, _ = cv2.Rodrigues(rvec)
@@ -135,6 +252,84 @@ class ArUcoDetector:
         
         return distance, (roll_deg, pitch_deg, yaw_deg)
     
+    def calculate_distances_and_orientations(self, rvecs, tvecs):
+        """
+        Calculate distance and orientation for all markers at once
+        
+        Args:
+            rvecs: rotation vectors, shape (N, 1, 3)
+            tvecs: translation vectors, shape (N, 1, 3)
+            
+        Returns:
+            distances: (N,) distances to markers in mm
+            angles: (N, 3) orientation angles (roll, pitch, yaw) in degrees
+        """
+        rvecs_arr = np.asarray(rvecs, dtype=np.float64).reshape(-1, 3)
+        distances = np.linalg.norm(np.asarray(tvecs, dtype=np.float64).reshape(-1, 3), axis=1)
+        
+        # Rodrigues' formula: R = cos(t) I + (1 - cos(t)) k k^T + sin(t) [k]x
+        theta = np.linalg.norm(rvecs_arr, axis=1)
+        k = rvecs_arr / np.where(theta > 1e-12, theta, 1.0)[:, None]
+        cos_t = np.cos(theta)[:, None, None]
+        sin_t = np.sin(theta)[:, None, None]
+        
+        k_cross = np.zeros((len(k), 3, 3))
+        k_cross[:, 0, 1] = -k[:, 2]
+        k_cross[:, 0, 2] = k[:, 1]
+        k_cross[:, 1, 0] = k[:, 2]
+        k_cross[:, 1, 2] = -k[:, 0]
+        k_cross[:, 2, 0] = -k[:, 1]
+        k_cross[:, 2, 1] = k[:, 0]
+        
+        rmat = (cos_t * np.eye(3) + (1 - cos_t) * k[:, :, None] * k[:, None, :]
+                + sin_t * k_cross)
+        
+        # Extract Euler angles using ZYX convention (yaw, pitch, roll)
+        sy = np.hypot(rmat[:, 0, 0], rmat[:, 1, 0])
+        singular = sy < 1e-6
+        
+        roll = np.where(singular,
+                        np.arctan2(-rmat[:, 1, 2], rmat[:, 1, 1]),
+                        np.arctan2(rmat[:, 2, 1], rmat[:, 2, 2]))
+        pitch = np.arctan2(-rmat[:, 2, 0], sy)
+        yaw = np.where(singular, 0.0, np.arctan2(rmat[:, 1, 0], rmat[:, 0, 0]))
+        
+        angles = np.degrees(np.stack((roll, pitch, yaw), axis=1))
+        
+        return distances, angles
+    
+    def get_frame_constants(self, frame_shape):
+        """
+        Get constants derived from the frame size, computed once per size
+        
+        Args:
+            frame_shape: shape of the frame (height, width, channels)
+            
+        Returns:
+            constants: dictionary with frame center, max distance,
+                       their reciprocals and grid line positions
+        """
+        key = frame_shape[:2]
+        constants = self._shape_cache.get(key)
+        if constants is None:
+            frame_height, frame_width = key
+            cx = frame_width // 2
+            cy = frame_height // 2
+            max_dist = math.sqrt(cx**2 + cy**2)
+            constants = {
+                'cx': cx,
+                'cy': cy,
+                'center': np.array([cx, cy]),
+                'max_dist': max_dist,
+                'inv_max_dist': 1.0 / max_dist,
+                'inv_cx': 1.0 / cx,
+                'inv_cy': 1.0 / cy,
+                'v_lines': [frame_width // 3, 2 * frame_width // 3],
+                'h_lines': [frame_height // 3, 2 * frame_height // 3]
+            }
+            self._shape_cache[key] = constants
+        return constants
+    
     def calculate_centering_metrics(self, marker_center, frame_shape):
         """
         Calculate how centered a marker is from the frame center
@@ -146,9 +341,9 @@ class ArUcoDetector:
         Returns:
             centering_metrics: dictionary with centering information
         """
-        frame_height, frame_width = frame_shape[:2]
-        frame_center_x = frame_width // 2
-        frame_center_y = frame_height // 2
+        constants = self.get_frame_constants(frame_shape)
+        frame_center_x = constants['cx']
+        frame_center_y = constants['cy']
         
         # Calculate offset from center
         offset_x = marker_center[0] - frame_center_x
@@ -157,15 +352,12 @@ class ArUcoDetector:
         # Calculate distance from center
         distance_from_center = math.sqrt(offset_x**2 + offset_y**2)
         
-        # Calculate maximum possible distance (corner of frame)
-        max_distance = math.sqrt(frame_center_x**2 + frame_center_y**2)
-        
         # Calculate centering percentage (100% = perfectly centered, 0% = at corner)
-        centering_percentage = max(0, 100 - (distance_from_center / max_distance) * 100)
+        centering_percentage = max(0, 100 - distance_from_center * constants['inv_max_dist'] * 100)
         
         # Calculate horizontal and vertical centering percentages
-        horizontal_centering = max(0, 100 - (abs(offset_x) / frame_center_x) * 100)
-        vertical_centering = max(0, 100 - (abs(offset_y) / frame_center_y) * 100)
+        horizontal_centering = max(0, 100 - abs(offset_x) * constants['inv_cx'] * 100)
+        vertical_centering = max(0, 100 - abs(offset_y) * constants['inv_cy'] * 100)
         
         # Determine direction from center
         direction = ""
@@ -187,6 +379,59 @@ class ArUcoDetector:
             'frame_center': (frame_center_x, frame_center_y)
         }
     
+    def calculate_centering_metrics_batch(self, centers_xy, frame_shape):
+        """
+        Calculate centering metrics for all markers at once
+        
+        Args:
+            centers_xy: (N, 2) array of marker center coordinates
+            frame_shape: shape of the frame (height, width, channels)
+            
+        Returns:
+            centering_metrics: dictionary of (N,) arrays plus a list of directions
+        """
+        constants = self.get_frame_constants(frame_shape)
+        frame_center_x = constants['cx']
+        frame_center_y = constants['cy']
+        
+        offsets = centers_xy - constants['center']
+        offset_x = offsets[:, 0]
+        offset_y = offsets[:, 1]
+        
+        distance_from_center = np.hypot(offset_x, offset_y)
+        
+        centering_percentage = np.clip(100 - distance_from_center * (constants['inv_max_dist'] * 100), 0, None)
+        horizontal_centering = np.clip(100 - np.abs(offset_x) * (constants['inv_cx'] * 100), 0, None)
+        vertical_centering = np.clip(100 - np.abs(offset_y) * (constants['inv_cy'] * 100), 0, None)
+        
+        # Encode directions (threshold of 10px to avoid noise) and look them up
+        x_code = (offset_x > 10).astype(np.int8) + (offset_x < -10) * 2
+        y_code = (offset_y > 10).astype(np.int8) + (offset_y < -10) * 2
+        direction = [_DIR_TABLE[c] for c in (x_code + 3 * y_code)]
+        
+        return {
+            'offset_x': offset_x,
+            'offset_y': offset_y,
+            'distance_from_center': distance_from_center,
+            'centering_percentage': centering_percentage,
+            'horizontal_centering': horizontal_centering,
+            'vertical_centering': vertical_centering,
+            'direction': direction,
+            'frame_center': (frame_center_x, frame_center_y)
+        }
+    
+    def draw_centering_grid(self, frame):
+        """
+        Draw the static rule-of-thirds grid (for better visual reference)
+        
+        Args:
+            frame: input image
+        """
+        constants = self.get_frame_constants(frame.shape)
+        # Vertical and horizontal lines as two slice writes
+        frame[:, constants['v_lines']] = _GRID_COLOR
+        frame[constants['h_lines'], :] = _GRID_COLOR
+    
     def draw_centering_visualization(self, frame, marker_center, centering_metrics):
         """
         Draw centering visualization on the frame
@@ -209,17 +454,71 @@ class ArUcoDetector:
         
         # Draw marker center point
         cv2.circle(frame, tuple(marker_center), 5, (0, 0, 255), -1)
+
+    
+    def detect_and_track(self, frame):
+        """
+        Lean detection path for headless use, no drawing or console output
         
-        # Draw centering grid (optional - for better visual reference)
-        height, width = frame.shape[:2]
-        # Vertical lines
-        for i in range(1, 3):
-            x = width * i // 3
-            cv2.line(frame, (x, 0), (x, height), (100, 100, 100), 1)
-        # Horizontal lines
-        for i in range(1, 3):
-            y = height * i // 3
-            cv2.line(frame, (0, y), (width, y), (100, 100, 100), 1)
+        Args:
+            frame: input image
+            
+        Returns:
+            ids: (N,) marker IDs
+            centers: (N, 2) marker centers in pixels
+            distances: (N,) distances in mm (NaN without pose)
+            yaws: (N,) yaw angles in degrees (NaN without pose)
+        """
+        corners, ids, _ = self.detect_markers(frame)
+        if ids is None:
+            empty = np.empty(0)
+            return np.empty(0, dtype=np.int32), np.empty((0, 2), dtype=np.int32), empty, empty
+        
+        ids = ids.ravel()
+        centers = np.concatenate(corners, axis=0).reshape(-1, 4, 2).mean(axis=1).astype(np.int32)
+        
+        if self.needs_pose and self.calibrated:
+            rvecs, tvecs = self.estimate_pose(corners, ids)
+            distances, angles = self.calculate_distances_and_orientations(rvecs, tvecs)
+            yaws = angles[:, 2]
+        else:
+            distances = np.full(len(ids), np.nan)
+            yaws = np.full(len(ids), np.nan)
+        
+        return ids, centers, distances, yaws
+    
+    def draw_info_block(self, frame, marker_center, info_text, top_offset):
+        """
+        Draw lines of text above a marker on one shared background rectangle
+        
+        Args:
+            frame: input image
+            marker_center: (x, y) coordinates of marker center
+            info_text: list of text lines
+            top_offset: distance from marker center to the first baseline
+        """
+        frame_height, frame_width = frame.shape[:2]
+        widths = [cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.45, 1)[0][0]
+                  for text in info_text]
+        block_width = max(widths)
+        block_height = _LINE_HEIGHT * (len(info_text) - 1)
+        
+        # Ensure the whole block stays within frame bounds
+        block_x = max(5, min(int(marker_center[0]) - block_width // 2,
+                             frame_width - block_width - 5))
+        first_y = max(15, min(int(marker_center[1]) - top_offset,
+                              frame_height - 5 - block_height))
+        
+        # Draw one background rectangle covering every line
+        cv2.rectangle(frame, (block_x - 3, first_y - 12),
+                      (block_x + block_width + 3, first_y + block_height + 3),
+                      (0, 0, 0), -1)
+        
+        # Draw text, each line centered within the block
+        for j, text in enumerate(info_text):
+            text_x = block_x + (block_width - widths[j]) // 2
+            cv2.putText(frame, text, (text_x, first_y + j * _LINE_HEIGHT),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 0), 1)
     
     def draw_markers_and_pose(self, frame, corners, ids, rvecs, tvecs):
         """
@@ -235,28 +534,45 @@ class ArUcoDetector:
         Returns:
             frame: image with drawn markers and pose information
         """
+        if not self.render:
+            return frame
+        
         if ids is not None:
             # Draw detected markers
             cv2.aruco.drawDetectedMarkers(frame, corners, ids)
             
+            # Compute all marker centers in one vectorized call
+            centers = np.concatenate(corners, axis=0).reshape(-1, 4, 2).mean(axis=1).astype(np.int32)
+            
+            # Calculate centering metrics for all markers
+            centering = self.calculate_centering_metrics_batch(centers, frame.shape)
+            
+            # Draw centering grid once per frame
+            self.draw_centering_grid(frame)
+            
+            # Only print to console once per log interval
+            now = time.monotonic()
+            log_now = now - self._last_log_t > self.log_interval
+            if log_now:
+                self._last_log_t = now
+            
             if self.calibrated and rvecs is not None and tvecs is not None:
+                # Calculate distance and orientation for all markers
+                distances, angles = self.calculate_distances_and_orientations(rvecs, tvecs)
+                
                 # Draw pose axes for each marker
                 for i in range(len(ids)):
                     cv2.drawFrameAxes(frame, self.camera_matrix, self.dist_coeffs,
                                     rvecs[i], tvecs[i], self.marker_size * 0.5)
                     
-                    # Calculate distance and orientation
-                    distance, angles = self.calculate_distance_and_orientation(rvecs[i], tvecs[i])
-                    roll, pitch, yaw = angles
+                    distance = distances[i]
+                    roll, pitch, yaw = angles[i]
                     
                     # Get marker center for text placement
-                    marker_center = np.mean(corners[i][0], axis=0).astype(int)
-                    
-                    # Calculate centering metrics
-                    centering_metrics = self.calculate_centering_metrics(marker_center, frame.shape)
+                    marker_center = centers[i]
                     
                     # Draw centering visualization
-                    self.draw_centering_visualization(frame, marker_center, centering_metrics)
+                    self.draw_centering_visualization(frame, marker_center, centering)
                     
                     # Draw marker information
                     info_text = [
@@ -265,92 +581,130 @@ class ArUcoDetector:
                         f"Roll: {roll:.1f}°",
                         f"Pitch: {pitch:.1f}°",
                         f"Yaw: {yaw:.1f}°",
-                        f"Centered: {centering_metrics['centering_percentage']:.1f}%",
-                        f"H-Center: {centering_metrics['horizontal_centering']:.1f}%",
-                        f"V-Center: {centering_metrics['vertical_centering']:.1f}%",
-                        f"Direction: {centering_metrics['direction']}"
+                        f"Centered: {centering['centering_percentage'][i]:.1f}%",
+                        f"H-Center: {centering['horizontal_centering'][i]:.1f}%",
+                        f"V-Center: {centering['vertical_centering'][i]:.1f}%",
+                        f"Direction: {centering['direction'][i]}"
                     ]
                     
-                    # Draw text with background
-                    y_offset = 0
-                    for text in info_text:
-                        text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.45, 1)[0]
-                        text_x = marker_center[0] - text_size[0] // 2
-                        text_y = marker_center[1] - 100 + y_offset
-                        
-                        # Ensure text stays within frame bounds
-                        text_x = max(5, min(text_x, frame.shape[1] - text_size[0] - 5))
-                        text_y = max(15, min(text_y, frame.shape[0] - 5))
-                        
-                        # Draw background rectangle
-                        cv2.rectangle(frame, (text_x - 3, text_y - 12), 
-                                    (text_x + text_size[0] + 3, text_y + 3), 
-                                    (0, 0, 0), -1)
-                        
-                        # Draw text
-                        cv2.putText(frame, text, (text_x, text_y), 
-                                  cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 0), 1)
-                        
-                        y_offset += 16
+                    # Draw text with a single background block
+                    self.draw_info_block(frame, marker_center, info_text, 100)
                     
                     # Print to console with centering info
-                    print(f"Marker ID {ids[i][0]}: Distance={distance:.1f}mm, "
-                          f"Roll={roll:.1f}°, Pitch={pitch:.1f}°, Yaw={yaw:.1f}°, "
-                          f"Centering={centering_metrics['centering_percentage']:.1f}%, "
-                          f"Direction={centering_metrics['direction']}")
+                    if log_now:
+                        print(f"Marker ID {ids[i][0]}: Distance={distance:.1f}mm, "
+                              f"Roll={roll:.1f}°, Pitch={pitch:.1f}°, Yaw={yaw:.1f}°, "
+                              f"Centering={centering['centering_percentage'][i]:.1f}%, "
+                              f"Direction={centering['direction'][i]}")
             else:
                 # If not calibrated, still show centering info
                 for i in range(len(ids)):
-                    marker_center = np.mean(corners[i][0], axis=0).astype(int)
-                    centering_metrics = self.calculate_centering_metrics(marker_center, frame.shape)
+                    marker_center = centers[i]
                     
                     # Draw centering visualization
-                    self.draw_centering_visualization(frame, marker_center, centering_metrics)
+                    self.draw_centering_visualization(frame, marker_center, centering)
                     
                     # Draw basic info
                     info_text = [
                         f"ID: {ids[i][0]}",
-                        f"Centered: {centering_metrics['centering_percentage']:.1f}%",
-                        f"H-Center: {centering_metrics['horizontal_centering']:.1f}%",
-                        f"V-Center: {centering_metrics['vertical_centering']:.1f}%",
-                        f"Direction: {centering_metrics['direction']}"
+                        f"Centered: {centering['centering_percentage'][i]:.1f}%",
+                        f"H-Center: {centering['horizontal_centering'][i]:.1f}%",
+                        f"V-Center: {centering['vertical_centering'][i]:.1f}%",
+                        f"Direction: {centering['direction'][i]}"
                     ]
                     
-                    y_offset = 0
-                    for text in info_text:
-                        text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.45, 1)[0]
-                        text_x = marker_center[0] - text_size[0] // 2
-                        text_y = marker_center[1] - 60 + y_offset
-                        
-                        # Ensure text stays within frame bounds
-                        text_x = max(5, min(text_x, frame.shape[1] - text_size[0] - 5))
-                        text_y = max(15, min(text_y, frame.shape[0] - 5))
-                        
-                        # Draw background rectangle
-                        cv2.rectangle(frame, (text_x - 3, text_y - 12), 
-                                    (text_x + text_size[0] + 3, text_y + 3), 
-                                    (0, 0, 0), -1)
-                        
-                        # Draw text
-                        cv2.putText(frame, text, (text_x, text_y), 
-                                  cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 0), 1)
-                        
-                        y_offset += 16
+                    self.draw_info_block(frame, marker_center, info_text, 60)
                     
-                    print(f"Marker ID {ids[i][0]}: Centering={centering_metrics['centering_percentage']:.1f}%, "
-                          f"Direction={centering_metrics['direction']}")
+                    if log_now:
+                        print(f"Marker ID {ids[i][0]}: Centering={centering['centering_percentage'][i]:.1f}%, "
+                              f"Direction={centering['direction'][i]}")
         
         return frame
 
-def main():
-    """Main function to run ArUco marker detection"""
+class FrameGrabber:
+    def __init__(self, cap):
+        """
+        Read frames from a camera on a background thread
+        
+        Only the most recent frame is kept so camera I/O overlaps with
+        detection instead of adding to it.
+        
+        Args:
+            cap: opened cv2.VideoCapture
+        """
+        self.cap = cap
+        self.frames = queue.Queue(maxsize=1)
+        self.running = False
+        self.thread = None
+        
+    def start(self):
+        """Start the grabber thread"""
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+    
+    def _run(self):
+        while self.running:
+            ret, frame = self.cap.read()
+            if not ret:
+                frame = None
+                self.running = False
+            
+            # Drop the stale frame so the consumer always gets the newest one
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                pass
+            self.frames.put(frame)
+    
+    def read(self, timeout=1.0):
+        """
+        Get the latest frame, blocking until one arrives
+        
+        Args:
+            timeout: how often (seconds) to check that the grabber thread is
+                still alive while waiting; a slow or warming-up camera is
+                waited for as long as it takes
+        
+        Returns:
+            ret: False if the camera stopped delivering frames
+            frame: latest frame or None
+        """
+        while True:
+            try:
+                frame = self.frames.get(timeout=timeout)
+            except queue.Empty:
+                # A live grabber always posts again, a frame or the None sentinel
+                if self.thread is not None and self.thread.is_alive():
+                    continue
+                return False, None
+            return frame is not None, frame
+    
+    def stop(self):
+        """Stop the grabber thread"""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+
+def main(headless=False):
+    """
+    Main function to run ArUco marker detection
+    
+    Args:
+        headless: skip drawing and the preview window, only track markers
+    """
     # Initialize detector
     detector = ArUcoDetector(
         calibration_file="camera_calibration.pkl",
         dictionary_type=cv2.aruco.DICT_6X6_250,
-        marker_size=50.0  # Adjust this to your actual marker size in mm
+        marker_size=50.0,  # Adjust this to your actual marker size in mm
+        render=not headless
     )
     
+    # Let OpenCV parallelize thresholding across all cores
+    cv2.setNumThreads(os.cpu_count())
+    
     # Initialize camera
     cap = cv2.VideoCapture(0)
     
@@ -358,9 +712,13 @@ def main():
         print("Error: Could not open camera")
         return
     
+    # Request MJPG from the camera to cut USB bandwidth and decode cost
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+    
     # Set camera resolution
     cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
     cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)      # Reduce buffer
     
     print("ArUco Marker Detection Started")
     print("Instructions:")
@@ -373,8 +731,27 @@ def main():
     
     frame_count = 0
     
+    # Capture on a separate thread so reads overlap with detection
+    grabber = FrameGrabber(cap).start()
+    
+    if headless:
+        print("Running headless - press Ctrl+C to stop")
+        try:
+            while True:
+                ret, frame = grabber.read()
+                if not ret:
+                    print("Error: Could not read frame")
+                    break
+                detector.detect_and_track(frame)
+        except KeyboardInterrupt:
+            pass
+        grabber.stop()
+        cap.release()
+        print("ArUco detection stopped")
+        return
+    
     while True:
-        ret, frame = cap.read()
+        ret, frame = grabber.read()
         if not ret:
             print("Error: Could not read frame")
             break
@@ -422,6 +799,7 @@ def main():
         
         frame_count += 1
     
+    grabber.stop()
     cap.release()
     cv2.destroyAllWindows()
     print("ArUco detection stopped")
@@ -463,8 +841,8 @@ def detect_from_image(image_path, detector=None):
     print(f"Detection result saved as: {output_path}")
 
 if __name__ == "__main__":
-    # Run real-time detection
-    main()
+    # Run real-time detection (pass --headless to skip the preview window)
+    main(headless="--headless" in sys.argv)
     
     # Uncomment to test with a static image
     # detect_from_image("test_image.jpg")
\ No newline at end of file
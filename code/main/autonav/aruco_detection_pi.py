@@ -2,8 +2,13 @@ import cv2
 import numpy as np
 import pickle
 import math
+import os
 import time
 
+# Short direction labels indexed by x_code + 3 * y_code
+# (x_code: 0 none, 1 right, 2 left; y_code: 0 none, 1 down, 2 up)
+_DIRS = np.array(['C', 'R', 'L', 'D', 'RD', 'LD', 'U', 'RU', 'LU'])
+
 class ArUcoDetectorRPi:
     def __init__(self, calibration_file="camera_calibration.pkl", 
                  dictionary_type=cv2.aruco.DICT_6X6_250, marker_size=50.0):
@@ -35,15 +40,37 @@ class ArUcoDetectorRPi:
         self.show_grid = False  # Toggle for grid display
         self.frame_skip = 2  # Process every nth frame
         self.frame_count = 0
+        self.downscale_detection = True  # Detect on a half-size image first
+        self.subpix_criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 10, 0.01)
+        
+        # Marker corner model in the order required by SOLVEPNP_IPPE_SQUARE
+        half = marker_size / 2.0
+        self._obj_pts = np.array([[-half, half, 0],
+                                  [half, half, 0],
+                                  [half, -half, 0],
+                                  [-half, -half, 0]], dtype=np.float32)
         
     def load_calibration(self, calibration_file):
-        """Load camera calibration parameters"""
+        """
+        Load camera calibration parameters
+        
+        A NumPy .npz file next to calibration_file (same base name) is
+        preferred; pickle is only used as a fallback for legacy files.
+        """
+        npz_file = os.path.splitext(calibration_file)[0] + '.npz'
         try:
-            with open(calibration_file, 'rb') as f:
-                calibration_data = pickle.load(f)
+            if os.path.exists(npz_file):
+                calibration_file = npz_file
+                with np.load(npz_file) as npz_data:
+                    calibration_data = {'camera_matrix': npz_data['camera_matrix'],
+                                        'dist_coeffs': npz_data['dist_coeffs']}
+            else:
+                with open(calibration_file, 'rb') as f:
+                    calibration_data = pickle.load(f)
             
-            self.camera_matrix = calibration_data['camera_matrix']
-            self.dist_coeffs = calibration_data['dist_coeffs']
+            # Cast once to contiguous float32 so OpenCV never recasts per call
+            self.camera_matrix = np.ascontiguousarray(calibration_data['camera_matrix'], dtype=np.float32)
+            self.dist_coeffs = np.ascontiguousarray(calibration_data['dist_coeffs'], dtype=np.float32)
             self.calibrated = True
             print(f"Camera calibration loaded from: {calibration_file}")
             
@@ -57,7 +84,24 @@ class ArUcoDetectorRPi:
     def detect_markers(self, frame):
         """Detect ArUco markers in frame"""
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        corners, ids, rejected = self.detector.detectMarkers(gray)
+        
+        if not self.downscale_detection:
+            return self.detector.detectMarkers(gray)
+        
+        # Coarse pass on a half-size image (4x fewer pixels to threshold)
+        small = cv2.resize(gray, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+        corners, ids, rejected = self.detector.detectMarkers(small)
+        
+        if ids is None:
+            # Nothing found at low resolution, escalate to the full frame
+            return self.detector.detectMarkers(gray)
+        
+        # Map corners back to full resolution and refine to sub-pixel accuracy
+        corners_full = np.concatenate(corners, axis=0).reshape(-1, 1, 2) * 2 + 0.5
+        cv2.cornerSubPix(gray, corners_full, (5, 5), (-1, -1), self.subpix_criteria)
+        corners = tuple(corners_full.reshape(-1, 1, 4, 2))
+        rejected = tuple(r * 2 + 0.5 for r in rejected)
+        
         return corners, ids, rejected
     
     def estimate_pose(self, corners, ids):
@@ -65,21 +109,38 @@ class ArUcoDetectorRPi:
         if not self.calibrated or ids is None:
             return None, None
             
-        rvecs, tvecs, _ = cv2.aruco.estimatePoseSingleMarkers(
-            corners, self.marker_size, self.camera_matrix, self.dist_coeffs)
+        image_points = np.concatenate(corners, axis=0).reshape(-1, 4, 2).astype(np.float32, copy=False)
+        n = len(image_points)
+        rvecs = np.empty((n, 1, 3), dtype=np.float64)
+        tvecs = np.empty((n, 1, 3), dtype=np.float64)
+        for i in range(n):
+            _, rvec_sols, tvec_sols, _ = cv2.solvePnPGeneric(
+                self._obj_pts, image_points[i], self.camera_matrix, self.dist_coeffs,
+                flags=cv2.SOLVEPNP_IPPE_SQUARE)
+            rvecs[i, 0] = rvec_sols[0].ravel()
+            tvecs[i, 0] = tvec_sols[0].ravel()
         
         return rvecs, tvecs
     
     def calculate_distance_and_orientation(self, rvec, tvec):
         """Calculate distance and orientation from pose vectors"""
-        distance = np.linalg.norm(tvec)
+        t = tvec.ravel()
+        distance = math.sqrt(t[0] * t[0] + t[1] * t[1] + t[2] * t[2])
         
-        # Simplified orientation calculation
-        rmat, _ = cv2.Rodrigues(rvec)
-        
-        # Quick yaw calculation (most important for tracking)
-        yaw = math.atan2(rmat[1, 0], rmat[0, 0])
-        yaw_deg = math.degrees(yaw)
+        # Quick yaw calculation (most important for tracking). Only the two
+        # rotation matrix elements yaw needs are built from the axis-angle
+        # vector, so no Rodrigues call or full 3x3 matrix is required:
+        # R00 = c + kx^2 (1 - c), R10 = kx ky (1 - c) + kz s
+        r = rvec.ravel()
+        theta = math.sqrt(r[0] * r[0] + r[1] * r[1] + r[2] * r[2])
+        if theta < 1e-12:
+            return distance, 0.0
+        kx, ky, kz = r[0] / theta, r[1] / theta, r[2] / theta
+        c = math.cos(theta)
+        one_c = 1.0 - c
+        r00 = c + kx * kx * one_c
+        r10 = kx * ky * one_c + kz * math.sin(theta)
+        yaw_deg = math.degrees(math.atan2(r10, r00))
         
         return distance, yaw_deg
     
@@ -115,6 +176,32 @@ class ArUcoDetectorRPi:
             'frame_center': (frame_center_x, frame_center_y)
         }
     
+    def calculate_centering_metrics_batch(self, centers, frame_shape):
+        """
+        Integer centering calculation for all markers at once
+        """
+        frame_height, frame_width = frame_shape[:2]
+        frame_center_x = frame_width >> 1
+        frame_center_y = frame_height >> 1
+        
+        # Chebyshev distance from center in integer math
+        offsets = centers - np.array([frame_center_x, frame_center_y], dtype=np.int32)
+        abs_offsets = np.abs(offsets)
+        max_offset = max(frame_center_x, frame_center_y)
+        cheb = abs_offsets.max(axis=1)
+        centering_percentage = np.maximum(0, 100 - (cheb * 100) // max_offset)
+        
+        # Direction codes looked up in the precomputed label table
+        x_code = np.where(abs_offsets[:, 0] > 20, np.where(offsets[:, 0] > 0, 1, 2), 0)
+        y_code = np.where(abs_offsets[:, 1] > 20, np.where(offsets[:, 1] > 0, 1, 2), 0)
+        direction = _DIRS[x_code + 3 * y_code]
+        
+        return {
+            'centering_percentage': centering_percentage,
+            'direction': direction,
+            'frame_center': (frame_center_x, frame_center_y)
+        }
+    
     def draw_minimal_visualization(self, frame, marker_center, centering_metrics):
         """Minimal visualization for RPi"""
         frame_center = centering_metrics['frame_center']
@@ -139,19 +226,26 @@ class ArUcoDetectorRPi:
             # Draw detected markers (simplified)
             cv2.aruco.drawDetectedMarkers(frame, corners, ids)
             
+            # Centering for all markers in one batch; corners is a list of
+            # (1, 4, 2) float32 arrays so one mean over the stack gives all centers
+            corner_stack = np.concatenate(corners, axis=0).reshape(-1, 4, 2)
+            centers = corner_stack.mean(axis=1).astype(np.int32)
+            centering = self.calculate_centering_metrics_batch(centers, frame.shape)
+            
             for i in range(len(ids)):
-                marker_center = np.mean(corners[i][0], axis=0).astype(int)
-                centering_metrics = self.calculate_centering_metrics(marker_center, frame.shape)
+                marker_center = centers[i]
+                centering_pct = centering['centering_percentage'][i]
+                direction = centering['direction'][i]
                 
                 # Draw minimal visualization
-                self.draw_minimal_visualization(frame, marker_center, centering_metrics)
+                self.draw_minimal_visualization(frame, marker_center, centering)
                 
                 # Minimal text info
                 if self.calibrated and rvecs is not None and tvecs is not None:
                     distance, yaw = self.calculate_distance_and_orientation(rvecs[i], tvecs[i])
-                    info_text = f"ID:{ids[i][0]} D:{distance:.0f}mm C:{centering_metrics['centering_percentage']:.0f}% {centering_metrics['direction']}"
+                    info_text = f"ID:{ids[i][0]} D:{distance:.0f}mm C:{centering_pct:.0f}% {direction}"
                 else:
-                    info_text = f"ID:{ids[i][0]} C:{centering_metrics['centering_percentage']:.0f}% {centering_metrics['direction']}"
+                    info_text = f"ID:{ids[i][0]} C:{centering_pct:.0f}% {direction}"
                 
                 # Single line of text
                 text_size = cv2.getTextSize(info_text, cv2.FONT_HERSHEY_SIMPLEX, 0.4, 1)[0]
@@ -161,12 +255,6 @@ class ArUcoDetectorRPi:
                 # Simple text without background rectangle
                 cv2.putText(frame, info_text, (text_x, text_y), 
                           cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 0), 1)
-                
-                # Simplified console output
-                if self.calibrated and rvecs is not None and tvecs is not None:
-                    print(f"ID {ids[i][0]}: Dist={distance:.0f}mm, Yaw={yaw:.0f}°, Center={centering_metrics['centering_percentage']:.0f}%")
-                else:
-                    print(f"ID {ids[i][0]}: Center={centering_metrics['centering_percentage']:.0f}%")
         
         return frame
 
@@ -199,18 +287,23 @@ def main():
     frame_count = 0
     fps_start_time = time.time()
     fps_frame_count = 0
+    fps = 0.0
     
     while True:
+        # Frame skipping for performance: grab() advances the stream
+        # without decoding, only processed frames are read in full
+        if frame_count % detector.frame_skip != 0:
+            if not cap.grab():
+                print("Error: Could not read frame")
+                break
+            frame_count += 1
+            continue
+        
         ret, frame = cap.read()
         if not ret:
             print("Error: Could not read frame")
             break
         
-        # Frame skipping for performance
-        if frame_count % detector.frame_skip != 0:
-            frame_count += 1
-            continue
-        
         # Detect markers
         corners, ids, rejected = detector.detect_markers(frame)
         
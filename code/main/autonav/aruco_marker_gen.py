@@ -1,7 +1,53 @@
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+
+# Markers are near binary images, so zlib level 1 gives almost the same
+# file size as the default level at a fraction of the encode time
+PNG_PARAMS = [int(cv2.IMWRITE_PNG_COMPRESSION), 1]
+
+@lru_cache(maxsize=None)
+def _aruco_dict(dictionary_type):
+    """Return the predefined ArUco dictionary, created once per type and process"""
+    return cv2.aruco.getPredefinedDictionary(dictionary_type)
+
+def _render_marker(marker_id, dictionary_type, marker_size, output_dir):
+    """
+    Generate and save a single marker (runs in a worker process)
+    
+    Args:
+        marker_id: marker ID to generate
+        dictionary_type: ArUco dictionary type
+        marker_size: size of marker in pixels
+        output_dir: directory to save marker images
+        
+    Returns:
+        filename: path of the saved marker image
+    """
+    # ArUco dictionaries don't pickle, so each worker creates (and caches) its own
+    aruco_dict = _aruco_dict(dictionary_type)
+    
+    # Generate marker straight into the lower part of the labeled display
+    # canvas, so one buffer serves both images
+    captioned = np.full((marker_size + 40, marker_size), 255, np.uint8)
+    marker_img = captioned[40:, :]
+    cv2.aruco.generateImageMarker(aruco_dict, marker_id, marker_size, marker_img, 1)
+    
+    # Save marker
+    filename = os.path.join(output_dir, f"aruco_marker_{marker_id}.png")
+    cv2.imwrite(filename, marker_img, PNG_PARAMS)
+    
+    # Labeled display version: caption drawn straight onto the array
+    caption = f"ID: {marker_id}"
+    text_size = cv2.getTextSize(caption, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)[0]
+    cv2.putText(captioned, caption, ((marker_size - text_size[0]) // 2, 28),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.7, 0, 2)
+    cv2.imwrite(os.path.join(output_dir, f"aruco_marker_{marker_id}_display.png"), captioned,
+                PNG_PARAMS)
+    
+    return filename
 
 def generate_aruco_markers(marker_ids=[0, 1, 2, 3, 4], marker_size=200, 
                           dictionary_type=cv2.aruco.DICT_6X6_250, output_dir="aruco_markers"):
@@ -18,30 +64,14 @@ def generate_aruco_markers(marker_ids=[0, 1, 2, 3, 4], marker_size=200,
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
     
-    # Create ArUco dictionary
-    aruco_dict = cv2.aruco.getPredefinedDictionary(dictionary_type)
-    
     print(f"Generating {len(marker_ids)} ArUco markers...")
     
-    for marker_id in marker_ids:
-        # Generate marker
-        marker_img = cv2.aruco.generateImageMarker(aruco_dict, marker_id, marker_size)
-        
-        # Save marker
-        filename = os.path.join(output_dir, f"aruco_marker_{marker_id}.png")
-        cv2.imwrite(filename, marker_img)
-        
-        print(f"Generated marker ID {marker_id}: {filename}")
-        
-        # Display marker (optional)
-        plt.figure(figsize=(4, 4))
-        plt.imshow(marker_img, cmap='gray')
-        plt.title(f'ArUco Marker ID: {marker_id}')
-        plt.axis('off')
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, f"aruco_marker_{marker_id}_display.png"), 
-                   bbox_inches='tight', dpi=300)
-        plt.show()
+    # Markers are independent, so render and encode them across all cores
+    render = partial(_render_marker, dictionary_type=dictionary_type,
+                     marker_size=marker_size, output_dir=output_dir)
+    with ProcessPoolExecutor() as executor:
+        for marker_id, filename in zip(marker_ids, executor.map(render, marker_ids)):
+            print(f"Generated marker ID {marker_id}: {filename}")
     
     print(f"\nAll markers saved in: {output_dir}")
     print("\nInstructions:")
@@ -51,7 +81,8 @@ def generate_aruco_markers(marker_ids=[0, 1, 2, 3, 4], marker_size=200,
     print("4. Use them for pose estimation")
 
 def generate_aruco_board(board_size=(4, 4), marker_size=100, marker_separation=20,
-                        dictionary_type=cv2.aruco.DICT_6X6_250, output_path="aruco_board.png"):
+                        dictionary_type=cv2.aruco.DICT_6X6_250, output_path="aruco_board.png",
+                        show=False):
     """
     Generate an ArUco board with multiple markers
     
@@ -61,9 +92,10 @@ def generate_aruco_board(board_size=(4, 4), marker_size=100, marker_separation=2
         marker_separation: separation between markers in pixels
         dictionary_type: ArUco dictionary type
         output_path: path to save the board image
+        show: display the board in a blocking matplotlib window
     """
-    # Create ArUco dictionary
-    aruco_dict = cv2.aruco.getPredefinedDictionary(dictionary_type)
+    # Get ArUco dictionary
+    aruco_dict = _aruco_dict(dictionary_type)
     
     # Create board
     board = cv2.aruco.GridBoard(board_size, marker_size, marker_separation, aruco_dict)
@@ -72,24 +104,33 @@ def generate_aruco_board(board_size=(4, 4), marker_size=100, marker_separation=2
     board_width = board_size[0] * marker_size + (board_size[0] - 1) * marker_separation
     board_height = board_size[1] * marker_size + (board_size[1] - 1) * marker_separation
     
-    # Generate board image
-    board_img = cv2.aruco.Board.generateImage(board, (board_width, board_height))
+    # Generate board image by tiling the markers into a white canvas; for a
+    # plain grid this matches Board.generateImage without its generic warp
+    board_img = np.full((board_height, board_width), 255, np.uint8)
+    step = marker_size + marker_separation
+    for i, marker_id in enumerate(board.getIds().ravel()):
+        row, col = divmod(i, board_size[0])
+        y, x = row * step, col * step
+        board_img[y:y + marker_size, x:x + marker_size] = cv2.aruco.generateImageMarker(
+            aruco_dict, int(marker_id), marker_size)
     
     # Save board
-    cv2.imwrite(output_path, board_img)
+    cv2.imwrite(output_path, board_img, PNG_PARAMS)
     
     print(f"ArUco board generated: {output_path}")
     print(f"Board size: {board_size[0]}x{board_size[1]} markers")
     print(f"Marker size: {marker_size} pixels")
     print(f"Marker separation: {marker_separation} pixels")
     
-    # Display board
-    plt.figure(figsize=(10, 8))
-    plt.imshow(board_img, cmap='gray')
-    plt.title(f'ArUco Board ({board_size[0]}x{board_size[1]} markers)')
-    plt.axis('off')
-    plt.tight_layout()
-    plt.show()
+    # Display board (matplotlib is only imported when a window is wanted)
+    if show:
+        import matplotlib.pyplot as plt
+        plt.figure(figsize=(10, 8))
+        plt.imshow(board_img, cmap='gray')
+        plt.title(f'ArUco Board ({board_size[0]}x{board_size[1]} markers)')
+        plt.axis('off')
+        plt.tight_layout()
+        plt.show()
     
     return board
 
@@ -112,7 +153,8 @@ if __name__ == "__main__":
         marker_size=100,
         marker_separation=20,
         dictionary_type=cv2.aruco.DICT_6X6_250,
-        output_path="aruco_board.png"
+        output_path="aruco_board.png",
+        show=False
     )
     
     print("\nArUco marker generation completed!")
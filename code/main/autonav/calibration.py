@@ -1,11 +1,154 @@
 import cv2
 import numpy as np
 import os
-import glob
 import pickle
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+# Calibration image types picked up by calibrate_camera
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".pgm")
+
+def downscaled_shape(shape, working_size=640):
+    """
+    Shape of the image find_chessboard_corners searches
+    
+    Args:
+        shape: full resolution image shape
+        working_size: longest side of the image used for detection
+        
+    Returns:
+        (height, width) of the downscaled image, or None if the image is
+        already small enough to be searched as is
+    """
+    scale = working_size / max(shape[:2])
+    if scale >= 1.0:
+        return None
+    return round(shape[0] * scale), round(shape[1] * scale)
+
+def find_chessboard_corners(gray, board_size, working_size=640,
+                            flags=cv2.CALIB_CB_ADAPTIVE_THRESH + cv2.CALIB_CB_NORMALIZE_IMAGE,
+                            dst=None):
+    """
+    Find chessboard corners on a downscaled copy of the image
+    
+    Detection cost scales with pixel count while the board geometry is
+    robust at lower resolution, so the search runs on an image whose
+    longest side is working_size and the corners are mapped back.
+    
+    Args:
+        gray: full resolution grayscale image
+        board_size: tuple (width, height) - number of internal corners
+        working_size: longest side of the image used for detection
+        flags: findChessboardCorners flags
+        dst: optional buffer of downscaled_shape() reused for the small image
+        
+    Returns:
+        ret: True if the chessboard was found
+        corners: unrefined corners in full resolution coordinates
+    """
+    small_shape = downscaled_shape(gray.shape, working_size)
+    if small_shape is None:
+        return cv2.findChessboardCorners(gray, board_size, flags=flags)
+    
+    scale = working_size / max(gray.shape[:2])
+    small = cv2.resize(gray, (small_shape[1], small_shape[0]), dst=dst, interpolation=cv2.INTER_AREA)
+    ret, corners = cv2.findChessboardCorners(small, board_size, flags=flags)
+    if ret:
+        # Map pixel centers of the small image back to the full image
+        corners = ((corners + 0.5) / scale - 0.5).astype(np.float32)
+    return ret, corners
+
+def subpix_window(corners, board_size, max_win=11):
+    """
+    Pick a cornerSubPix half window from the spacing between corners
+    
+    Args:
+        corners: detected corners, shape (N, 1, 2)
+        board_size: tuple (width, height) - number of internal corners
+        max_win: upper bound for the half window size
+        
+    Returns:
+        win: (w, w) half window size
+    """
+    grid = corners.reshape(board_size[1], board_size[0], 2)
+    dx = np.linalg.norm(np.diff(grid, axis=1), axis=2).min()
+    dy = np.linalg.norm(np.diff(grid, axis=0), axis=2).min()
+    w = int(min(max_win, max(3, min(dx, dy) / 4)))
+    return (w, w)
+
+def _detect(image_file, board_size):
+    """
+    Find and refine chessboard corners in one image (runs in a worker process)
+    
+    Args:
+        image_file: path to calibration image
+        board_size: tuple (width, height) - number of internal corners
+        
+    Returns:
+        (img_shape, corners_refined), (img_shape, None) if no chessboard
+        was found, or None if the image could not be read
+    """
+    return _detect_image(cv2.imread(image_file), board_size)
+
+def _detect_image(img, board_size):
+    """
+    Find and refine chessboard corners in an already decoded image
+    
+    Args:
+        img: BGR image, or None if it could not be read
+        board_size: tuple (width, height) - number of internal corners
+        
+    Returns:
+        Same as _detect
+    """
+    if img is None:
+        return None
+        
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    img_shape = gray.shape[::-1]  # (width, height)
+    
+    # Find chessboard corners on a downscaled copy
+    ret, corners = find_chessboard_corners(
+        gray, board_size,
+        flags=cv2.CALIB_CB_FAST_CHECK + cv2.CALIB_CB_ADAPTIVE_THRESH + cv2.CALIB_CB_NORMALIZE_IMAGE)
+    
+    if not ret:
+        return img_shape, None
+    
+    # Refine corners on the full resolution image
+    corners_refined = cv2.cornerSubPix(gray, corners, subpix_window(corners, board_size), (-1, -1),
+                                     (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001))
+    return img_shape, corners_refined
+
+def prefetch_images(image_files, depth=2):
+    """
+    Read images on a background thread so decoding overlaps with detection
+    
+    Args:
+        image_files: list of image paths
+        depth: number of decoded images to keep ready
+        
+    Yields:
+        Decoded image (or None if unreadable) for each path, in order
+    """
+    q = queue.Queue(maxsize=depth)
+    
+    def reader():
+        for image_file in image_files:
+            q.put(cv2.imread(image_file))
+        q.put(StopIteration)
+    
+    threading.Thread(target=reader, daemon=True).start()
+    while True:
+        img = q.get()
+        if img is StopIteration:
+            return
+        yield img
 
 def calibrate_camera(images_dir="calibration_images", board_size=(9, 6), square_size=1.0, 
-                    output_file="camera_calibration.pkl"):
+                    output_file="camera_calibration.npz", workers=None):
     """
     Perform camera calibration using captured images
     
@@ -14,18 +157,27 @@ def calibrate_camera(images_dir="calibration_images", board_size=(9, 6), square_
         board_size: tuple (width, height) - number of internal corners
         square_size: size of each square in real world units (e.g., mm, cm)
         output_file: file to save calibration results
+        workers: number of detection processes (default: one per CPU). With
+                 workers=1 detection runs in this process while a reader
+                 thread prefetches the next images
     """
-    # Prepare object points
+    # Prepare object points once; every view shares this float32 array so
+    # OpenCV never has to convert it
     objp = np.zeros((board_size[0] * board_size[1], 3), np.float32)
-    objp[:, :2] = np.mgrid[0:board_size[0], 0:board_size[1]].T.reshape(-1, 2) * square_size
+    grid = np.mgrid[0:board_size[0], 0:board_size[1]].astype(np.float32).T.reshape(-1, 2)
+    objp[:, :2] = grid * np.float32(square_size)
     
     # Arrays to store object points and image points
     objpoints = []  # 3D points in real world space
     imgpoints = []  # 2D points in image plane
     
     # Get list of calibration images
-    image_files = glob.glob(os.path.join(images_dir, "*.jpg"))
-    image_files.extend(glob.glob(os.path.join(images_dir, "*.png")))
+    # One directory pass for all supported extensions
+    image_files = []
+    if os.path.isdir(images_dir):
+        with os.scandir(images_dir) as entries:
+            image_files = sorted(entry.path for entry in entries
+                                 if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS))
     
     if len(image_files) == 0:
         print(f"No images found in {images_dir}")
@@ -36,39 +188,29 @@ def calibrate_camera(images_dir="calibration_images", board_size=(9, 6), square_
     successful_detections = 0
     img_shape = None
     
-    for i, image_file in enumerate(image_files):
+    # Images are independent until calibrateCamera, so detect corners in parallel
+    if workers == 1:
+        results = [_detect_image(img, board_size) for img in prefetch_images(image_files)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            results = list(executor.map(partial(_detect, board_size=board_size), image_files))
+    
+    for i, (image_file, result) in enumerate(zip(image_files, results)):
         print(f"Processing image {i+1}/{len(image_files)}: {os.path.basename(image_file)}")
         
-        img = cv2.imread(image_file)
-        if img is None:
+        if result is None:
             print(f"Could not read image: {image_file}")
             continue
-            
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        img_shape = gray.shape[::-1]  # (width, height)
-        
-        # Find chessboard corners
-        ret, corners = cv2.findChessboardCorners(gray, board_size, None)
-        
-        if ret:
-            # Refine corners
-            corners_refined = cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1),
-                                             (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001))
-            
+        
+        img_shape, corners_refined = result
+        
+        if corners_refined is not None:
             objpoints.append(objp)
-            imgpoints.append(corners_refined)
+            imgpoints.append(np.ascontiguousarray(corners_refined, dtype=np.float32))
             successful_detections += 1
-            
-            # Optionally visualize detected corners
-            img_with_corners = img.copy()
-            cv2.drawChessboardCorners(img_with_corners, board_size, corners_refined, ret)
-            # cv2.imshow('Corners', img_with_corners)
-            # cv2.waitKey(100)
         else:
             print(f"  - Could not find chessboard corners in {os.path.basename(image_file)}")
     
-    cv2.destroyAllWindows()
-    
     print(f"Successfully detected chessboard in {successful_detections}/{len(image_files)} images")
     
     if successful_detections < 10:
@@ -80,21 +222,17 @@ def calibrate_camera(images_dir="calibration_images", board_size=(9, 6), square_
     
     # Perform camera calibration
     print("Performing camera calibration...")
-    ret, camera_matrix, dist_coeffs, rvecs, tvecs = cv2.calibrateCamera(
+    (ret, camera_matrix, dist_coeffs, rvecs, tvecs,
+     _, _, per_view_errors) = cv2.calibrateCameraExtended(
         objpoints, imgpoints, img_shape, None, None)
     
     if ret:
         print("Camera calibration successful!")
         
-        # Calculate calibration error
-        total_error = 0
-        for i in range(len(objpoints)):
-            imgpoints2, _ = cv2.projectPoints(objpoints[i], rvecs[i], tvecs[i], camera_matrix, dist_coeffs)
-            error = cv2.norm(imgpoints[i], imgpoints2, cv2.NORM_L2) / len(imgpoints2)
-            total_error += error
-        
-        mean_error = total_error / len(objpoints)
-        print(f"Mean reprojection error: {mean_error:.4f} pixels")
+        # Calculate calibration error from the per-view RMS errors
+        # returned by OpenCV (no extra projectPoints pass)
+        mean_error = float(np.sqrt((per_view_errors ** 2).mean()))
+        print(f"Mean reprojection error (RMS): {mean_error:.4f} pixels")
         
         # Print calibration results
         print("\nCalibration Results:")
@@ -108,20 +246,19 @@ def calibrate_camera(images_dir="calibration_images", board_size=(9, 6), square_
         focal_length_mm = (camera_matrix[0, 0] * sensor_width_mm) / img_shape[0]
         print(f"\nEstimated focal length: {focal_length_mm:.2f} mm")
         
-        # Save calibration results
+        # Save calibration results (per-view vectors stacked into arrays)
         calibration_data = {
             'camera_matrix': camera_matrix,
             'dist_coeffs': dist_coeffs,
-            'rvecs': rvecs,
-            'tvecs': tvecs,
-            'image_shape': img_shape,
-            'reprojection_error': mean_error,
-            'board_size': board_size,
-            'square_size': square_size
+            'rvecs': np.stack(rvecs),
+            'tvecs': np.stack(tvecs),
+            'image_shape': np.array(img_shape),
+            'reprojection_error': np.float64(mean_error),
+            'board_size': np.array(board_size),
+            'square_size': np.float64(square_size)
         }
         
-        with open(output_file, 'wb') as f:
-            pickle.dump(calibration_data, f)
+        np.savez(output_file, **calibration_data)
         
         print(f"\nCalibration data saved to: {output_file}")
         
@@ -130,19 +267,24 @@ def calibrate_camera(images_dir="calibration_images", board_size=(9, 6), square_
         print("Camera calibration failed!")
         return None
 
-def load_calibration(calibration_file="camera_calibration.pkl"):
+def load_calibration(calibration_file="camera_calibration.npz"):
     """
     Load camera calibration data from file
     
     Args:
-        calibration_file: path to calibration file
+        calibration_file: path to calibration file (.npz, or a legacy .pkl)
         
     Returns:
         calibration_data: dictionary containing calibration parameters
     """
     try:
-        with open(calibration_file, 'rb') as f:
-            calibration_data = pickle.load(f)
+        if calibration_file.endswith('.pkl'):
+            # Legacy pickle file
+            with open(calibration_file, 'rb') as f:
+                calibration_data = pickle.load(f)
+        else:
+            with np.load(calibration_file) as npz_data:
+                calibration_data = {key: npz_data[key] for key in npz_data.files}
         print(f"Calibration data loaded from: {calibration_file}")
         return calibration_data
     except FileNotFoundError:
@@ -158,7 +300,7 @@ if __name__ == "__main__":
         images_dir="calibration_images",
         board_size=(9, 6),
         square_size=25.0,  # 25mm squares (adjust to your printed chessboard)
-        output_file="camera_calibration.pkl"
+        output_file="camera_calibration.npz"
     )
     
     if calibration_data:
@@ -1,8 +1,9 @@
 import cv2
-import numpy as np
 import os
 import time
 
+from calibration import find_chessboard_corners
+
 def capture_calibration_images(board_size=(9, 6), num_images=20, output_dir="calibration_images"):
     """
     Capture calibration images using webcam
@@ -23,15 +24,20 @@ def capture_calibration_images(board_size=(9, 6), num_images=20, output_dir="cal
         print("Error: Could not open camera")
         return
     
+    # Request MJPG so 720p is not limited by uncompressed USB bandwidth
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+    
     # Set camera resolution (optional)
     cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
     cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-    
-    # Prepare object points
-    objp = np.zeros((board_size[0] * board_size[1], 3), np.float32)
-    objp[:, :2] = np.mgrid[0:board_size[0], 0:board_size[1]].T.reshape(-1, 2)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)      # Drop stale frames
     
     captured_count = 0
+    next_capture_allowed_at = 0.0  # Debounce SPACE without pausing the preview
+    
+    # Motion gating: thumbnail of the frame the last detection ran on
+    last_small = None
+    ret_corners, corners = False, None
     
     print(f"Capturing {num_images} calibration images...")
     print("Instructions:")
@@ -48,19 +54,26 @@ def capture_calibration_images(board_size=(9, 6), num_images=20, output_dir="cal
         
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         
-        # Find chessboard corners
-        ret_corners, corners = cv2.findChessboardCorners(gray, board_size, None)
+        # Reuse the last detection while the scene has not moved since it ran
+        small = cv2.resize(gray, (80, 45), interpolation=cv2.INTER_AREA)
+        still = last_small is not None and cv2.mean(cv2.absdiff(small, last_small))[0] < 2.0
+        
+        if not (still and ret_corners):
+            # Find chessboard corners on a downscaled copy; FAST_CHECK makes
+            # frames without a board return almost immediately
+            ret_corners, corners = find_chessboard_corners(
+                gray, board_size,
+                flags=cv2.CALIB_CB_FAST_CHECK + cv2.CALIB_CB_ADAPTIVE_THRESH + cv2.CALIB_CB_NORMALIZE_IMAGE)
+            last_small = small
         
-        # Display frame
-        display_frame = frame.copy()
+        # Draw overlays straight onto the frame; gray above is the clean
+        # copy that gets saved
+        display_frame = frame
         
         if ret_corners:
-            # Refine corners
-            corners_refined = cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), 
-                                             (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001))
-            
-            # Draw corners
-            cv2.drawChessboardCorners(display_frame, board_size, corners_refined, ret_corners)
+            # Draw corners (sub-pixel refinement is left to calibrate_camera,
+            # the preview only needs the rough positions)
+            cv2.drawChessboardCorners(display_frame, board_size, corners, ret_corners)
             
             # Add text
             cv2.putText(display_frame, f"Chessboard detected! Press SPACE to capture ({captured_count}/{num_images})", 
@@ -76,15 +89,17 @@ def capture_calibration_images(board_size=(9, 6), num_images=20, output_dir="cal
         
         key = cv2.waitKey(1) & 0xFF
         
-        if key == ord(' ') and ret_corners:
-            # Save the image
-            filename = os.path.join(output_dir, f"calibration_{captured_count:02d}.jpg")
-            cv2.imwrite(filename, frame)
+        if key == ord(' ') and ret_corners and time.monotonic() >= next_capture_allowed_at:
+            # Save the image as uncompressed grayscale PGM: lossless for corner
+            # refinement, and no JPEG encode in the capture loop
+            filename = os.path.join(output_dir, f"calibration_{captured_count:02d}.pgm")
+            cv2.imwrite(filename, gray)
             captured_count += 1
             print(f"Captured image {captured_count}/{num_images}: {filename}")
             
-            # Brief pause to avoid multiple captures
-            time.sleep(0.5)
+            # Ignore SPACE for a moment to avoid multiple captures, while the
+            # loop keeps reading frames so none go stale in the camera buffer
+            next_capture_allowed_at = time.monotonic() + 0.5
             
         elif key == ord('q'):
             print("Capture cancelled by user")
@@ -1,14 +1,23 @@
 import asyncio
 import websockets
-import json
+import orjson
 import cv2
 import numpy as np
-import base64
+try:
+    # SIMD base64 decoder with the same API as the stdlib module
+    import pybase64 as base64
+except ImportError:
+    import base64
 import pickle
-import math
 import time
-from io import BytesIO
-from PIL import Image
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+def _dumps(obj):
+    """Serialize a message for a JSON text frame (NumPy scalars allowed)"""
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
 
 class ArUcoWebSocketServer:
     def __init__(self, calibration_file="camera_calibration.pkl",
@@ -23,7 +32,16 @@ class ArUcoWebSocketServer:
         """
         self.dictionary_type = dictionary_type
         self.marker_size = marker_size
+
+        # Marker corner model in the order required by SOLVEPNP_IPPE_SQUARE
+        half = marker_size / 2.0
+        self._obj_pts = np.array([[-half, half, 0],
+                                  [half, half, 0],
+                                  [half, -half, 0],
+                                  [-half, -half, 0]], dtype=np.float32)
         self.connected_clients = set()
+        self.calibration_file = calibration_file
+        self._pool = None  # Detection processes, see start_server
 
         # Load camera calibration
         self.load_calibration(calibration_file)
@@ -33,11 +51,13 @@ class ArUcoWebSocketServer:
         self.detector_params = cv2.aruco.DetectorParameters()
 
         # Optimize detector parameters for better detection
-        self.detector_params.adaptiveThreshWinSizeMin = 3
-        self.detector_params.adaptiveThreshWinSizeMax = 23
+        # A single adaptive threshold pass: the markers appear within a narrow
+        # size range, so the 3/13/23 window sweep mostly repeated work
+        self.detector_params.adaptiveThreshWinSizeMin = 13
+        self.detector_params.adaptiveThreshWinSizeMax = 13
         self.detector_params.adaptiveThreshWinSizeStep = 10
         self.detector_params.adaptiveThreshConstant = 7
-        self.detector_params.minMarkerPerimeterRate = 0.03
+        self.detector_params.minMarkerPerimeterRate = 0.05  # Reject tiny contours early
         self.detector_params.maxMarkerPerimeterRate = 4.0
         self.detector_params.polygonalApproxAccuracyRate = 0.03
         self.detector_params.minCornerDistanceRate = 0.05
@@ -46,6 +66,16 @@ class ArUcoWebSocketServer:
 
         # Create detector
         self.detector = cv2.aruco.ArucoDetector(self.aruco_dict, self.detector_params)
+        self._detectMarkers = self.detector.detectMarkers  # Bound once, called every frame
+
+        # Grayscale buffer reused frame to frame
+        self._gray_buf = None
+
+        # Serializes frame processing across client worker threads
+        self._process_lock = threading.Lock()
+
+        # Navigation commands for every decision branch
+        self._nav_table = self._build_nav_table()
 
         # Statistics
         self.frame_count = 0
@@ -75,21 +105,21 @@ class ArUcoWebSocketServer:
             self.dist_coeffs = None
             self.calibrated = False
 
-    def base64_to_image(self, base64_string):
-        """Convert base64 string to OpenCV image"""
+    def base64_to_image(self, base64_string, grayscale=False):
+        """Convert base64 string to OpenCV image (single channel if grayscale)"""
         try:
             # Remove data URL prefix if present
             if base64_string.startswith('data:image'):
                 base64_string = base64_string.split(',')[1]
 
             # Decode base64
-            image_data = base64.b64decode(base64_string)
+            image_data = base64.b64decode(base64_string, validate=False)
 
-            # Convert to PIL Image
-            pil_image = Image.open(BytesIO(image_data))
-
-            # Convert to OpenCV format
-            opencv_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+            # Decode the JPEG straight from the byte buffer; imdecode
+            # already returns BGR (or luminance only), so no colour
+            # conversion is needed
+            flags = cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR
+            opencv_image = cv2.imdecode(np.frombuffer(image_data, np.uint8), flags)
 
             return opencv_image
 
@@ -97,10 +127,17 @@ class ArUcoWebSocketServer:
             print(f"Error converting base64 to image: {e}")
             return None
 
-    def detect_markers(self, frame):
-        """Detect ArUco markers in frame"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        corners, ids, rejected = self.detector.detectMarkers(gray)
+    def _to_gray(self, frame):
+        """Convert a BGR frame to grayscale into a buffer reused across frames"""
+        if frame.ndim == 2:
+            return frame
+        if self._gray_buf is None or self._gray_buf.shape != frame.shape[:2]:
+            self._gray_buf = np.empty(frame.shape[:2], np.uint8)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray_buf)
+
+    def detect_markers(self, gray):
+        """Detect ArUco markers in a grayscale frame"""
+        corners, ids, rejected = self._detectMarkers(gray)
         return corners, ids, rejected
 
     def estimate_pose(self, corners, ids):
@@ -108,35 +145,50 @@ class ArUcoWebSocketServer:
         if not self.calibrated or ids is None:
             return None, None
 
-        rvecs, tvecs, _ = cv2.aruco.estimatePoseSingleMarkers(
-            corners, self.marker_size, self.camera_matrix, self.dist_coeffs)
+        # Estimate pose for each marker (IPPE_SQUARE is closed form for planar squares)
+        image_points = np.concatenate(corners, axis=0).reshape(-1, 4, 2).astype(np.float32, copy=False)
+        n = len(image_points)
+        rvecs = np.empty((n, 1, 3), dtype=np.float64)
+        tvecs = np.empty((n, 1, 3), dtype=np.float64)
+        for i in range(n):
+            # Solutions are sorted by reprojection error, keep the best one
+            _, rvec_sols, tvec_sols, _ = cv2.solvePnPGeneric(
+                self._obj_pts, image_points[i], self.camera_matrix, self.dist_coeffs,
+                flags=cv2.SOLVEPNP_IPPE_SQUARE)
+            rvecs[i, 0] = rvec_sols[0].ravel()
+            tvecs[i, 0] = tvec_sols[0].ravel()
 
         return rvecs, tvecs
 
     def calculate_distance_and_orientation(self, rvec, tvec):
         """Calculate distance and orientation from pose vectors"""
-        distance = np.linalg.norm(tvec)
+        distances, angles = self.calculate_distances_and_orientations([rvec], [tvec])
+        roll_deg, pitch_deg, yaw_deg = angles[0].tolist()
+        return float(distances[0]), (roll_deg, pitch_deg, yaw_deg)
 
-        rmat, _ = cv2.Rodrigues(rvec)
+    def calculate_distances_and_orientations(self, rvecs, tvecs):
+        """
+        Calculate distance and orientation for all markers at once
 
-        sy = math.sqrt(rmat[0, 0] * rmat[0, 0] + rmat[1, 0] * rmat[1, 0])
+        Returns:
+            distances: (N,) distances to markers
+            angles: (N, 3) orientation angles (roll, pitch, yaw) in degrees
+        """
+        distances = np.linalg.norm(np.asarray(tvecs).reshape(-1, 3), axis=1)
+        rmats = np.stack([cv2.Rodrigues(rvec)[0] for rvec in rvecs])
 
+        sy = np.hypot(rmats[:, 0, 0], rmats[:, 1, 0])
         singular = sy < 1e-6
 
-        if not singular:
-            roll = math.atan2(rmat[2, 1], rmat[2, 2])
-            pitch = math.atan2(-rmat[2, 0], sy)
-            yaw = math.atan2(rmat[1, 0], rmat[0, 0])
-        else:
-            roll = math.atan2(-rmat[1, 2], rmat[1, 1])
-            pitch = math.atan2(-rmat[2, 0], sy)
-            yaw = 0
+        # Near gimbal lock fall back to the alternative roll and zero yaw;
+        # both variants are computed for every marker and selected per element
+        roll = np.where(singular,
+                        np.arctan2(-rmats[:, 1, 2], rmats[:, 1, 1]),
+                        np.arctan2(rmats[:, 2, 1], rmats[:, 2, 2]))
+        pitch = np.arctan2(-rmats[:, 2, 0], sy)
+        yaw = np.where(singular, 0.0, np.arctan2(rmats[:, 1, 0], rmats[:, 0, 0]))
 
-        roll_deg = math.degrees(roll)
-        pitch_deg = math.degrees(pitch)
-        yaw_deg = math.degrees(yaw)
-
-        return distance, (roll_deg, pitch_deg, yaw_deg)
+        return distances, np.degrees(np.stack((roll, pitch, yaw), axis=1))
 
     def calculate_centering_metrics(self, marker_center, frame_shape):
         """Calculate how centered a marker is horizontally from the frame center"""
@@ -161,6 +213,52 @@ class ArUcoWebSocketServer:
             'frame_center_x': int(frame_center_x)
         }
 
+    def calculate_centering_metrics_batch(self, centers_x, frame_shape):
+        """Calculate horizontal centering metrics for all markers at once"""
+        frame_center_x = frame_shape[1] // 2
+
+        offset_x = centers_x - frame_center_x
+        horizontal_centering_percentage = np.maximum(0, 100 - (np.abs(offset_x) / frame_center_x) * 100)
+
+        # Same 10 px "centered" threshold as calculate_centering_metrics
+        direction = np.where(np.abs(offset_x) > 10,
+                             np.where(offset_x > 0, "Right", "Left"), "Centered")
+
+        return {
+            'offset_x': offset_x,
+            'horizontal_centering_percentage': horizontal_centering_percentage,
+            'direction': direction,
+            'frame_center_x': frame_center_x
+        }
+
+    def _build_nav_table(self):
+        """
+        Precompute navigate_robot's command lists, keyed by
+        (tilt or direction, within distance threshold)
+        """
+        # Tilted forward/up (marker is below center, or angled down): rotate right to
+        # correct tilt (assuming robot rotates right for ArrowLeft input to level),
+        # move a bit forward, then rotate back to original orientation
+        tilt_forward = ("ArrowLeft", "ArrowUp", "ArrowRight")
+        # Tilted backward/down (marker is above center, or angled up): mirrored
+        tilt_backward = ("ArrowRight", "ArrowUp", "ArrowLeft")
+
+        return {
+            # Tilt correction (only if distance > 500, otherwise move back to gain space)
+            ('tilt_forward', True): ("ArrowDown",),
+            ('tilt_forward', False): tilt_forward,
+            ('tilt_backward', True): ("ArrowDown",),
+            ('tilt_backward', False): tilt_backward,
+            # Horizontal centering: rotate ~20° towards the marker
+            ('Left', True): ("ArrowLeft",),
+            ('Left', False): ("ArrowLeft",),
+            ('Right', True): ("ArrowRight",),
+            ('Right', False): ("ArrowRight",),
+            # Move closer until the centered marker is within 300
+            ('Centered', True): ("STOP",),
+            ('Centered', False): ("ArrowUp",),
+        }
+
     def navigate_robot(self, marker_data):
         """
         Generates robot navigation commands based on marker data.
@@ -170,110 +268,85 @@ class ArUcoWebSocketServer:
         distance = marker_data.get('distance_mm')
         pitch = marker_data.get('pitch_deg')
 
-        commands = []
-
         if direction is None or distance is None or pitch is None:
             # Cannot navigate without complete data
             return ["WAIT"] # Or an appropriate default command
 
-        # Step 1: Tilt Correction (only if abs(pitch) > 30 and distance > 500)
+        # Step 1: Tilt correction, Steps 2/3: horizontal centering then approach
         if abs(pitch) > 30:
-            if distance <= 500:
-                commands.append("ArrowDown")  # Move back to gain space
-                return commands
-
-            if pitch > 0: # Tilted forward/up (marker is below center, or angled down)
-                commands.append("ArrowLeft")     # Rotate right to correct tilt (assuming robot rotates right for ArrowLeft input to level)
-                commands.append("ArrowUp")       # Move a bit forward
-                commands.append("ArrowRight")    # Rotate back to original orientation
-            else: # Tilted backward/down (marker is above center, or angled up)
-                commands.append("ArrowRight")    # Rotate left to correct tilt
-                commands.append("ArrowUp")       # Move a bit forward
-                commands.append("ArrowLeft")     # Rotate back to original orientation
-
-            return commands  # Don't proceed to next step this round
-
-        # Step 2: Horizontal Centering
-        if direction == "Left":
-            commands.append("ArrowLeft")  # Rotate left ~20°
-        elif direction == "Right":
-            commands.append("ArrowRight")  # Rotate right ~20°
-
-        # Step 3: Move closer
-        elif direction == "Centered":
-            if distance > 300:
-                commands.append("ArrowUp")
-            else:
-                # Marker is centered and close enough
-                commands.append("STOP")  # Or no-op
-        return commands
+            key = ('tilt_forward' if pitch > 0 else 'tilt_backward', distance <= 500)
+        else:
+            key = (direction, distance <= 300)
+
+        return list(self._nav_table.get(key, ()))
+
+    def process_frame(self, frame, columnar=False):
+        """
+        Process a frame and detect ArUco markers (regular mode)
 
-    def process_frame(self, frame):
+        Returns:
+            One dict per marker, or with columnar=True one array/list per
+            field ('id', 'center_x', ...) covering all markers
+        """
         print("Processing frame for ArUco markers...")
-        """Process a frame and detect ArUco markers"""
         self.frame_count += 1
 
-        # Detect markers
-        corners, ids, rejected = self.detect_markers(frame)
+        # Detect markers (the only grayscale conversion for this frame)
+        corners, ids, rejected = self.detect_markers(self._to_gray(frame))
 
-        detection_results = []
+        if ids is None:
+            return {} if columnar else []
 
-        if ids is not None:
-            self.detection_count += 1
+        self.detection_count += 1
 
-            # Estimate pose
-            rvecs, tvecs = self.estimate_pose(corners, ids)
-
-            for i in range(len(ids)):
-                marker_center = np.mean(corners[i][0], axis=0).astype(int)
-                centering_metrics = self.calculate_centering_metrics(marker_center, frame.shape)
-
-                marker_result = {
-                    'id': int(ids[i][0]),
-                    'center_x': int(marker_center[0]),
-                    'horizontal_centering_percentage': centering_metrics['horizontal_centering_percentage'],
-                    'direction': centering_metrics['direction'],
-                    'offset_x': centering_metrics['offset_x'],
-                    'commands': [] # Initialize commands list
-                }
-
-                if self.calibrated and rvecs is not None and tvecs is not None:
-                    distance, angles = self.calculate_distance_and_orientation(rvecs[i], tvecs[i])
-                    _, pitch, _ = angles
-
-                    marker_result.update({
-                        'distance_mm': float(distance),
-                        'pitch_deg': float(pitch)
-                    })
+        # Estimate pose
+        rvecs, tvecs = self.estimate_pose(corners, ids)
+
+        # Centers, centering and pose for all markers at once
+        centers = np.asarray(corners).reshape(-1, 4, 2).mean(axis=1).astype(np.int32)
+        centering_metrics = self.calculate_centering_metrics_batch(centers[:, 0], frame.shape)
 
-                    # Generate navigation commands using the new function
-                    # Ensure the data passed to navigate_robot matches its expected structure
-                    nav_data = {
-                        'direction': marker_result['direction'],
-                        'distance_mm': marker_result['distance_mm'],
-                        'pitch_deg': marker_result['pitch_deg']
-                    }
-                    marker_result['commands'] = self.navigate_robot(nav_data)
-                else:
-                    # If not calibrated, or pose estimation failed, provide default commands
-                    marker_result['commands'] = ["CALIBRATION_NEEDED"]
-
-
-                detection_results.append(marker_result)
-
-                # Print to console (simplified)
-                if self.calibrated and rvecs is not None:
-                    print(f"Marker ID {ids[i][0]}: Distance={marker_result['distance_mm']:.1f}mm, "
-                          f"Pitch={marker_result['pitch_deg']:.1f}°, "
-                          f"Horizontal Centering={marker_result['horizontal_centering_percentage']:.1f}%, "
-                          f"Direction={marker_result['direction']}, "
-                          f"Commands={marker_result['commands']}")
-                else:
-                    print(f"Marker ID {ids[i][0]}: Horizontal Centering={marker_result['horizontal_centering_percentage']:.1f}%, "
-                          f"Direction={marker_result['direction']}, "
-                          f"Commands={marker_result['commands']}")
-
-        return detection_results
+        # One column per field; orjson serializes the numeric arrays directly
+        # (they have to be C-contiguous, hence no strided column views)
+        columns = {
+            'id': ids.ravel().astype(np.int32),
+            'center_x': np.ascontiguousarray(centers[:, 0]),
+            'horizontal_centering_percentage': centering_metrics['horizontal_centering_percentage'],
+            'direction': centering_metrics['direction'].tolist(),
+            'offset_x': centering_metrics['offset_x'],
+        }
+
+        if self.calibrated and rvecs is not None and tvecs is not None:
+            distances, angles = self.calculate_distances_and_orientations(rvecs, tvecs)
+            columns['distance_mm'] = distances
+            columns['pitch_deg'] = np.ascontiguousarray(angles[:, 1])
+
+            # Generate navigation commands
+            columns['commands'] = [
+                self.navigate_robot({'direction': direction, 'distance_mm': distance, 'pitch_deg': pitch})
+                for direction, distance, pitch in zip(columns['direction'], distances, columns['pitch_deg'])]
+        else:
+            # If not calibrated, or pose estimation failed, provide default commands
+            columns['commands'] = [["CALIBRATION_NEEDED"] for _ in range(len(ids))]
+
+        # Print to console (simplified)
+        for i in range(len(ids)):
+            if 'distance_mm' in columns:
+                print(f"Marker ID {columns['id'][i]}: Distance={columns['distance_mm'][i]:.1f}mm, "
+                      f"Pitch={columns['pitch_deg'][i]:.1f}°, "
+                      f"Horizontal Centering={columns['horizontal_centering_percentage'][i]:.1f}%, "
+                      f"Direction={columns['direction'][i]}, "
+                      f"Commands={columns['commands'][i]}")
+            else:
+                print(f"Marker ID {columns['id'][i]}: Horizontal Centering={columns['horizontal_centering_percentage'][i]:.1f}%, "
+                      f"Direction={columns['direction'][i]}, "
+                      f"Commands={columns['commands'][i]}")
+
+        if columnar:
+            return columns
+
+        # One dict per marker for clients that expect the row layout
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
 
     def get_statistics(self):
         """Get processing statistics"""
@@ -289,64 +362,130 @@ class ArUcoWebSocketServer:
             'elapsed_time': float(elapsed_time)
         }
 
+    def _build_frame_response(self, base64_string, columnar=False):
+        """Decode and process one frame into a response message (runs in a worker thread)"""
+        # Detection and calibration only use luminance, so let the JPEG
+        # decoder skip chroma entirely
+        frame = self.base64_to_image(base64_string, grayscale=True)
+        if frame is None:
+            return {
+                'type': 'error',
+                'message': 'Failed to process frame'
+            }
+
+        # Clients share the detector, buffers and statistics
+        with self._process_lock:
+            detection_results = self.process_frame(frame, columnar)
+            response = self._detection_response(detection_results, columnar)
+
+        return response
+
+    def _detection_response(self, detection_results, columnar=False):
+        """Wrap process_frame results into a detection_result message"""
+        return {
+            'type': 'detection_result',
+            'markers_count': len(detection_results.get('id', ())) if columnar else len(detection_results),
+            'markers': detection_results,
+            'statistics': self.get_statistics()
+        }
+
+    async def _build_frame_response_in_pool(self, base64_string, columnar=False):
+        """Same as _build_frame_response, with decoding and detection in a worker process"""
+        loop = asyncio.get_running_loop()
+        detection_results = await loop.run_in_executor(
+            self._pool, _process_frame_in_worker, base64_string, columnar)
+        if detection_results is None:
+            return {
+                'type': 'error',
+                'message': 'Failed to process frame'
+            }
+
+        # Statistics are kept in this process
+        self.frame_count += 1
+        if len(detection_results):
+            self.detection_count += 1
+
+        return self._detection_response(detection_results, columnar)
+
+    async def _frame_worker(self, websocket, latest_frame, frame_ready):
+        """Process the newest frame of one client off the event loop"""
+        try:
+            while True:
+                await frame_ready.wait()
+                frame_ready.clear()
+                data, latest_frame[0] = latest_frame[0], None
+
+                try:
+                    if self._pool is not None and len(self.connected_clients) > 1:
+                        # Several clients: give each frame its own core instead
+                        # of taking turns on the shared detector
+                        response = await self._build_frame_response_in_pool(
+                            data['data'], data.get('columnar', False))
+                    else:
+                        response = await asyncio.to_thread(self._build_frame_response, data['data'],
+                                                           data.get('columnar', False))
+                    message = _dumps(response)
+                except Exception as e:
+                    print(f"Error processing frame: {e}")
+                    message = _dumps({
+                        'type': 'error',
+                        'message': str(e)
+                    })
+
+                await websocket.send(message)
+
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
     async def handle_client(self, websocket):
         """Handle WebSocket client connection"""
         self.connected_clients.add(websocket)
         client_addr = websocket.remote_address
+
+        # Latest-wins frame slot processed by a per-client worker task
+        latest_frame = [None]
+        frame_ready = asyncio.Event()
+        worker = asyncio.create_task(self._frame_worker(websocket, latest_frame, frame_ready))
         # print(f"Client connected: {client_addr}")
 
         try:
             # print(f"Handling client {client_addr}")
             # Send connection confirmation
-            await websocket.send(json.dumps({
+            await websocket.send(_dumps({
                 'type': 'status',
-                'message': 'Connected to ArUco detection server'
+                'message': 'Connected to ArUco detection server',
+                'grayscale': True,  # Grayscale JPEG frames are accepted (and preferred)
+                'columnar': True    # Frames sent with 'columnar': true get markers as one array per field
             }))
             # print(f"Connection confirmation sent to {client_addr}")
 
             async for message in websocket:
                 # print(f"Received message from {client_addr}: {message}")
                 try:
-                    data = json.loads(message)
+                    data = orjson.loads(message)
 
                     if data['type'] == 'frame':
-                        # Process frame
-                        frame = self.base64_to_image(data['data'])
-
-                        if frame is not None:
-                            detection_results = self.process_frame(frame)
-
-                            # Send detection results back
-                            response = {
-                                'type': 'detection_result',
-                                'markers_count': len(detection_results),
-                                'markers': detection_results,
-                                'statistics': self.get_statistics()
-                            }
-
-                            await websocket.send(json.dumps(response))
-                        else:
-                            await websocket.send(json.dumps({
-                                'type': 'error',
-                                'message': 'Failed to process frame'
-                            }))
+                        # Keep only the newest frame; the worker picks it up
+                        # and frames that arrive meanwhile replace each other
+                        latest_frame[0] = data
+                        frame_ready.set()
 
                     elif data['type'] == 'get_stats':
                         # Send statistics
-                        await websocket.send(json.dumps({
+                        await websocket.send(_dumps({
                             'type': 'statistics',
                             'data': self.get_statistics()
                         }))
 
-                except json.JSONDecodeError:
-                    await websocket.send(json.dumps({
+                except orjson.JSONDecodeError:
+                    await websocket.send(_dumps({
                         'type': 'error',
                         'message': 'Invalid JSON message'
                     }))
 
                 except Exception as e:
                     print(f"Error processing message: {e}")
-                    await websocket.send(json.dumps({
+                    await websocket.send(_dumps({
                         'type': 'error',
                         'message': str(e)
                     }))
@@ -358,25 +497,57 @@ class ArUcoWebSocketServer:
             print(f"Error handling client {client_addr}: {e}")
 
         finally:
+            worker.cancel()
             self.connected_clients.discard(websocket)
 
     async def start_server(self, host='localhost', port=8765):
         """Start the WebSocket server"""
         print(f"Starting ArUco WebSocket server on {host}:{port}")
 
-        async with websockets.serve(self.handle_client, host, port):
-            print("Server started. Waiting for connections...")
-            print("Press Ctrl+C to stop the server")
+        # Detection processes for when several clients are connected; each
+        # loads the calibration once through the initializer. Workers start
+        # from a forkserver rather than a fork of this process, which by then
+        # runs the event loop, to_thread workers and OpenCV's thread pool
+        self._pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(), initializer=_init_detection_worker,
+            initargs=(self.calibration_file, self.dictionary_type, self.marker_size),
+            mp_context=multiprocessing.get_context("forkserver"))
+
+        try:
+            async with websockets.serve(self.handle_client, host, port):
+                print("Server started. Waiting for connections...")
+                print("Press Ctrl+C to stop the server")
+
+                try:
+                    await asyncio.Future()  # Run forever
+                except KeyboardInterrupt:
+                    print("\nServer stopped by user")
+        finally:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+# Detector of a pool worker process, created once by _init_detection_worker
+_worker_server = None
+
+def _init_detection_worker(calibration_file, dictionary_type, marker_size):
+    """Set up the detector of a detection worker process"""
+    global _worker_server
+    _worker_server = ArUcoWebSocketServer(calibration_file=calibration_file,
+                                          dictionary_type=dictionary_type, marker_size=marker_size)
 
-            try:
-                await asyncio.Future()  # Run forever
-            except KeyboardInterrupt:
-                print("\nServer stopped by user")
+def _process_frame_in_worker(base64_string, columnar=False):
+    """Decode and detect one frame in a worker process (None if it could not be decoded)"""
+    frame = _worker_server.base64_to_image(base64_string, grayscale=True)
+    if frame is None:
+        return None
+    return _worker_server.process_frame(frame, columnar)
 
 def main():
     """Main function to run the ArUco WebSocket server"""
     server = ArUcoWebSocketServer(
         calibration_file="camera_calibration.pkl",
+        # The printed markers are 6x6; DICT_6X6_50 holds the same first 50 codes
+        # if fewer candidates are ever wanted. A 4x4 set would mean reprinting them
         dictionary_type=cv2.aruco.DICT_6X6_250,
         marker_size=50.0  # Adjust this to your actual marker size in mm
     )
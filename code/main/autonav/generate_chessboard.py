@@ -1,8 +1,8 @@
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
 
-def generate_chessboard_pattern(board_size=(9, 6), square_size=50, output_path="chessboard.png"):
+def generate_chessboard_pattern(board_size=(9, 6), square_size=50, output_path="chessboard.png",
+                                show=False):
     """
     Generate a chessboard pattern for camera calibration
     
@@ -10,33 +10,25 @@ def generate_chessboard_pattern(board_size=(9, 6), square_size=50, output_path="
         board_size: tuple (width, height) - number of internal corners
         square_size: size of each square in pixels
         output_path: path to save the chessboard image
+        show: display the pattern in a blocking matplotlib window
     """
-    # Calculate image dimensions
-    img_width = (board_size[0] + 1) * square_size
-    img_height = (board_size[1] + 1) * square_size
-    
-    # Create chessboard pattern
-    chessboard = np.zeros((img_height, img_width), dtype=np.uint8)
-    
-    for i in range(board_size[1] + 1):
-        for j in range(board_size[0] + 1):
-            if (i + j) % 2 == 0:
-                y_start = i * square_size
-                y_end = (i + 1) * square_size
-                x_start = j * square_size
-                x_end = (j + 1) * square_size
-                chessboard[y_start:y_end, x_start:x_end] = 255
+    # Create chessboard pattern: one pixel per square (white where row + column
+    # is even), then blow every pixel up to a square_size block
+    squares = np.add.outer(np.arange(board_size[1] + 1), np.arange(board_size[0] + 1)) % 2 == 0
+    chessboard = np.kron(squares.astype(np.uint8) * 255, np.ones((square_size, square_size), dtype=np.uint8))
     
     # Save the chessboard
     cv2.imwrite(output_path, chessboard)
     print(f"Chessboard pattern saved as {output_path}")
     
-    # Display the chessboard
-    plt.figure(figsize=(10, 8))
-    plt.imshow(chessboard, cmap='gray')
-    plt.title(f'Chessboard Pattern ({board_size[0]}x{board_size[1]} corners)')
-    plt.axis('off')
-    plt.show()
+    # Display the chessboard (matplotlib is only imported when a window is wanted)
+    if show:
+        import matplotlib.pyplot as plt
+        plt.figure(figsize=(10, 8))
+        plt.imshow(chessboard, cmap='gray')
+        plt.title(f'Chessboard Pattern ({board_size[0]}x{board_size[1]} corners)')
+        plt.axis('off')
+        plt.show()
     
     return chessboard
 
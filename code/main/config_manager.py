@@ -1,6 +1,8 @@
 # config_manager.py
 import json
+import orjson
 import os
+import tempfile
 import time
 from getpass import getpass
 
@@ -44,11 +46,65 @@ def save_robot_config(robot_id, password):
         print(f"Error saving configuration: {e}")
         return False
 
+def write_file_atomically(path, payload):
+    """Write bytes to a temp file, fsync it and rename it over path
+
+    The temp file sits next to path so os.replace stays on one filesystem;
+    readers never see a partial file and a crash mid-write leaves the old
+    file intact.
+
+    Args:
+        path: file to replace
+        payload: bytes to write
+
+    Returns:
+        inode of the new file
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                    prefix=f".{os.path.basename(path)}")
+    try:
+        os.write(fd, payload)
+        os.fchmod(fd, 0o644)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        os.unlink(tmp_path)
+        raise
+    return os.stat(path).st_ino
+
+# (inode, bytes) of the last state file this process wrote. A save with the
+# same bytes is skipped while that file is still in place; another process
+# replacing it gives it a new inode, which forces the next write
+_last_saved_state = (None, None)
+
+def write_system_state(payload):
+    """Atomically replace SYSTEM_STATE_FILE with payload bytes, unless it already holds them
+
+    Args:
+        payload: serialized state (bytes)
+
+    Returns:
+        True if the file was written, False if the write was skipped
+    """
+    global _last_saved_state
+    last_inode, last_payload = _last_saved_state
+    if payload == last_payload:
+        try:
+            if os.stat(SYSTEM_STATE_FILE).st_ino == last_inode:
+                return False
+        except FileNotFoundError:
+            pass
+
+    _last_saved_state = (write_file_atomically(SYSTEM_STATE_FILE, payload), payload)
+    return True
+
 def save_system_state(state):
     """Save current system state"""
     try:
-        with open(SYSTEM_STATE_FILE, "w") as file:
-            json.dump(state, file, indent=2)
+        write_system_state(orjson.dumps(state, option=orjson.OPT_INDENT_2))
     except Exception as e:
         print(f"Error saving system state: {e}")
 
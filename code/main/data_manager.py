@@ -1,24 +1,24 @@
 # data_manager.py
 import json
+import orjson
 import time
 import os
-from config_manager import WEBSOCKET_DATA_FILE, MQTT_LOG_FILE, ROBOT_CREDENTIALS_FILE
+from config_manager import WEBSOCKET_DATA_FILE, MQTT_LOG_FILE, ROBOT_CREDENTIALS_FILE, write_file_atomically
 
 def store_data_locally(data):
     """Store WebSocket/MQTT data locally"""
     try:
         # Store both in JSON file and a more persistent log
-        with open(WEBSOCKET_DATA_FILE, "w") as file:
-            json.dump(data, file, indent=2)
+        write_file_atomically(WEBSOCKET_DATA_FILE, orjson.dumps(data, option=orjson.OPT_INDENT_2))
         
-        # Write to log file with timestamp
-        with open(MQTT_LOG_FILE, "w") as log_file:
-            log_entry = {
-                "timestamp": time.time(),
-                "formatted_time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
-                "data": data
-            }
-            log_file.write(json.dumps(log_entry) + "\n")
+        # Write to log file with timestamp. motor_thread loads this file with
+        # json.load as the current credentials, so it keeps only the latest entry
+        log_entry = {
+            "timestamp": time.time(),
+            "formatted_time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
+            "data": data
+        }
+        write_file_atomically(MQTT_LOG_FILE, orjson.dumps(log_entry, option=orjson.OPT_APPEND_NEWLINE))
         
         print(f"✓ WebSocket data stored: {data}")
         return True
@@ -50,8 +50,8 @@ def get_data_locally():
     """Retrieve locally stored WebSocket data"""
     try:
         if os.path.exists(WEBSOCKET_DATA_FILE):
-            with open(WEBSOCKET_DATA_FILE, "r") as file:
-                return json.load(file)
+            with open(WEBSOCKET_DATA_FILE, "rb") as file:
+                return orjson.loads(file.read())
         else:
             print("No local WebSocket data found")
             return None
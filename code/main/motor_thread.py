@@ -1,43 +1,97 @@
 # motor_thread.py
 import json
+import orjson
 import time
+import asyncio
 import os
 import threading
 import multiprocessing
+import multiprocessing.connection
+from multiprocessing.shared_memory import SharedMemory
 import signal
+import struct
 import sys
+import queue
 from AWSIoTPythonSDK.MQTTLib import AWSIoTMQTTClient
-from ultrasonic_thread2 import measure_distance
+from ultrasonic_thread2 import measure_distance, create_distance_ring, latest_slot
 import RPi.GPIO as GPIO
 import subprocess
 import signal
 import read_battery_precentage
+from config_manager import save_system_state, write_system_state
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, the plain functions do the same work
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+try:
+    import lgpio  # Writes all four motor pins with a single ioctl
+except ImportError:  # Fall back to RPi.GPIO for the motor pins
+    lgpio = None
 
 # Motor GPIO pins
 IN1, IN2 = 13, 27
 IN3, IN4 = 22, 23
+MOTOR_PINS = (IN1, IN2, IN3, IN4)
+MOTOR_GPIOCHIP = 0  # gpiochip the motor pins are claimed on when lgpio is available
+
+# (IN1, IN2, IN3, IN4) levels for each motor command
+FORWARD = (GPIO.HIGH, GPIO.LOW, GPIO.HIGH, GPIO.LOW)
+BACKWARD = (GPIO.LOW, GPIO.HIGH, GPIO.LOW, GPIO.HIGH)
+LEFT = (GPIO.LOW, GPIO.HIGH, GPIO.HIGH, GPIO.LOW)
+RIGHT = (GPIO.HIGH, GPIO.LOW, GPIO.LOW, GPIO.HIGH)
+STOP = (GPIO.LOW, GPIO.LOW, GPIO.LOW, GPIO.LOW)
+
+# Print every motor command (off by default, the commands arrive at ~10 Hz)
+DEBUG = False
 
 GPIO.setmode(GPIO.BCM)
 GPIO.setwarnings(False)
-GPIO.setup(IN1, GPIO.OUT)
-GPIO.setup(IN2, GPIO.OUT)
-GPIO.setup(IN3, GPIO.OUT)
-GPIO.setup(IN4, GPIO.OUT)
+if lgpio:
+    # The four pins form one group led by IN1; bit i of a group write sets MOTOR_PINS[i]
+    motor_chip = lgpio.gpiochip_open(MOTOR_GPIOCHIP)
+    lgpio.group_claim_output(motor_chip, list(MOTOR_PINS), [0] * len(MOTOR_PINS))
+    _GROUP_BITS = {pattern: sum(level << i for i, level in enumerate(pattern))
+                   for pattern in (FORWARD, BACKWARD, LEFT, RIGHT, STOP)}
+else:
+    motor_chip = None
+    GPIO.setup(MOTOR_PINS, GPIO.OUT)
 
 # Global variables
 distence = 50
-shared_distances = multiprocessing.Array('d', [100.0, 100.0])  # [front, back]
-blocked_directions = multiprocessing.Array('b', [0, 0])        # [front_blocked, back_blocked]
-motor_timer = None
+# [front, back] samples from the ultrasonic process, see ultrasonic_thread2
+distance_ring_shm, distance_ring, distance_ring_tail, new_distance_sample = create_distance_ring()
+# [front_blocked, back_blocked], written by monitor_obstacles only
+blocked_shm = SharedMemory(create=True, size=2)
+blocked_directions = np.ndarray((2,), dtype=np.int8, buffer=blocked_shm.buf)
+blocked_directions[:] = 0
+SHARED_MEMORY_OWNER = os.getpid()  # Children inherit the mappings, only this process unlinks them
+motor_stop_deadline = None  # time.monotonic() the motors stop at, None when idle
+motor_stop_lock = threading.Lock()
+motor_stop_wakeup = threading.Event()
 mqtt_client = None
 ultrasonic_process = None
 obstacle_process = None
 system_running = True
 video_process = None
+read_battery_precentage_process = None
+publish_queue = multiprocessing.Queue()  # (topic, payload, qos) from child processes, see drain_publish_queue
+log_queue = queue.Queue()  # Lines for the log writer thread, see start_log_writer
+log_thread = None
+command_loop = None  # Runs the MQTT message handlers, see start_command_loop
+
+# A child that dies sooner than this after starting is restarted only once
+# this long has passed, so a process that fails at start-up does not spin
+RESTART_BACKOFF = 5
 
 # Configuration files
 MQTT_LOG_FILE = "mqtt_data_log.json"
-SYSTEM_STATE_FILE = "system_state.json"
+
+# Written on every shutdown and disconnect, so serialized once here
+DISCONNECTED_STATE = orjson.dumps({"connected": False, "processes": []}, option=orjson.OPT_INDENT_2)
 
 def signal_handler(signum, frame):
     """Handle shutdown signals"""
@@ -46,24 +100,23 @@ def signal_handler(signum, frame):
     system_running = False
     cleanup_and_exit()
 
-def save_system_state(state):
-    """Save current system state"""
+def save_disconnected_state():
+    """Write the pre-serialized disconnected state"""
     try:
-        with open(SYSTEM_STATE_FILE, "w") as file:
-            json.dump(state, file, indent=2)
+        write_system_state(DISCONNECTED_STATE)
     except Exception as e:
         print(f"Error saving system state: {e}")
 
 def cleanup_and_exit():
     """Clean up resources and exit"""
-    global mqtt_client, ultrasonic_process, obstacle_process, motor_timer, system_running,read_battery_precentage_process
+    global mqtt_client, ultrasonic_process, obstacle_process, system_running,read_battery_precentage_process
     
+    stop_log_writer()
     print("🧹 Starting cleanup process...")
     system_running = False
     
     # Stop motor timer
-    if motor_timer:
-        motor_timer.cancel()
+    cancel_motor_stop()
     
     # Stop motors
     motor_stop()
@@ -82,6 +135,7 @@ def cleanup_and_exit():
         ultrasonic_process.join(timeout=5)
         if ultrasonic_process.is_alive():
             ultrasonic_process.kill()
+            ultrasonic_process.join()
         print("📏 Ultrasonic process terminated")
     
     if obstacle_process and obstacle_process.is_alive():
@@ -89,24 +143,46 @@ def cleanup_and_exit():
         obstacle_process.join(timeout=5)
         if obstacle_process.is_alive():
             obstacle_process.kill()
+            obstacle_process.join()
         print("🚧 Obstacle monitoring process terminated")
 
-    if video_process and video_process.poll() is None:
-        print("🛑 Terminating video process...")
-        video_process.terminate()
-        video_process.wait()
-
     if read_battery_precentage_process and read_battery_precentage_process.is_alive():
         print("🛑 Terminating read battery precentage process...")
         read_battery_precentage_process.terminate()
-        read_battery_precentage_process.wait()
+        read_battery_precentage_process.join(timeout=5)
+        if read_battery_precentage_process.is_alive():
+            read_battery_precentage_process.kill()
+            read_battery_precentage_process.join()
+
+    if video_process and video_process.poll() is None:
+        print("🛑 Terminating video process...")
+        # Closing stdin lets the manager end a running call and exit on its own.
+        # The children above inherited the pipe's write end, so EOF only
+        # arrives once they have all exited
+        video_process.stdin.close()
+        try:
+            video_process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            video_process.terminate()
+            video_process.wait()
 
     # GPIO cleanup
+    if motor_chip is not None:
+        lgpio.group_free(motor_chip, IN1)
+        lgpio.gpiochip_close(motor_chip)
     GPIO.cleanup()
     print("🔌 GPIO cleaned up")
     
+    # Shared sensor memory
+    if os.getpid() == SHARED_MEMORY_OWNER:
+        for shm in (distance_ring_shm, blocked_shm):
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass  # Already unlinked by an earlier cleanup
+    
     # Update system state
-    save_system_state({"connected": False, "processes": []})
+    save_disconnected_state()
     
     print("✅ Cleanup complete")
     sys.exit(0)
@@ -134,7 +210,7 @@ def disconnect_system():
             print(f"⚠️ Error removing {file_path}: {e}")
     
     # Update system state to disconnected
-    save_system_state({"connected": False, "processes": []})
+    save_disconnected_state()
     
     print("📡 System disconnected - waiting for new connect message")
     cleanup_and_exit()
@@ -152,159 +228,257 @@ def reconnect_system():
     # The system will automatically reconnect using the existing credentials
     # This is handled by the main initialization process
 
+# === Logging ===
+def _write_log():
+    for message in iter(log_queue.get, None):
+        sys.stdout.write(message + "\n")
+
+def start_log_writer():
+    """Start this process's log writer thread (threads are not inherited across fork)"""
+    global log_queue, log_thread
+    log_queue = queue.Queue()
+    log_thread = threading.Thread(target=_write_log, daemon=True)
+    log_thread.start()
+
+def log(message):
+    """Queue a line for the log writer instead of printing from a hot path"""
+    log_queue.put_nowait(message)
+
+def stop_log_writer():
+    """Write out whatever is still queued"""
+    if log_thread:
+        log_queue.put(None)
+        log_thread.join(timeout=1)
+
+# === MQTT publishing for child processes ===
+def drain_publish_queue():
+    """Publish what child processes put on publish_queue through the one MQTT connection"""
+    for topic, payload, qos in iter(publish_queue.get, None):
+        try:
+            mqtt_client.publish(topic, payload, qos)
+        except Exception as e:
+            print(f"⚠️ Error publishing to {topic}: {e}")
+
+# === Video call ===
+def start_video_manager():
+    """Start video_call_manager.py once; calls are then started and stopped through its stdin"""
+    global video_process
+    video_process = subprocess.Popen(["python3", "-u", "video_call_manager.py", "--daemon"],
+                                     stdin=subprocess.PIPE)
+
+def send_video_command(command):
+    """Send one start/stop command to the video call manager, restarting it if it died"""
+    if video_process is None or video_process.poll() is not None:
+        print("⚠️ Video call manager not running, starting it...")
+        start_video_manager()
+    try:
+        video_process.stdin.write(orjson.dumps(command) + b"\n")
+        video_process.stdin.flush()
+    except (BrokenPipeError, OSError) as e:
+        print(f"⚠️ Error sending video call command: {e}")
+
 # === Motor control functions ===
-def stop_motor_after_timeout(timeout=0.2):
-    global motor_timer
-    if motor_timer:
-        motor_timer.cancel()
-    motor_timer = threading.Timer(timeout, motor_stop)
-    motor_timer.start()
+def _drive(pattern):
+    """Set all four motor pins in one call"""
+    if motor_chip is not None:
+        lgpio.group_write(motor_chip, IN1, _GROUP_BITS[pattern])
+    else:
+        GPIO.output(MOTOR_PINS, pattern)
+
+def _motor_stop_worker():
+    """Stop the motors when the current deadline passes (one thread for all commands)"""
+    global motor_stop_deadline
+    while True:
+        with motor_stop_lock:
+            deadline = motor_stop_deadline
+            if deadline is not None and deadline <= time.monotonic():
+                # Stopped under the lock so a new command cannot start in between
+                motor_stop_deadline = None
+                motor_stop()
+                continue
+
+        if deadline is None:
+            motor_stop_wakeup.wait()
+        else:
+            motor_stop_wakeup.wait(deadline - time.monotonic())
+        motor_stop_wakeup.clear()
+
+def _drive_for(pattern, timeout):
+    """Drive the motors and arm the stop deadline as one step under motor_stop_lock
+
+    The stop worker cannot run between the two, so it cannot stop the motors
+    before the pins are written and leave them running with no stop pending.
+    """
+    global motor_stop_deadline
+    with motor_stop_lock:
+        _drive(pattern)
+        motor_stop_deadline = time.monotonic() + timeout
+    motor_stop_wakeup.set()
+
+def cancel_motor_stop():
+    global motor_stop_deadline
+    with motor_stop_lock:
+        motor_stop_deadline = None
+    motor_stop_wakeup.set()
 
 def motor_forward(timeout=0.2):
     if not system_running:
         return
-    print("🚀 Moving forward")
-    GPIO.output(IN1, GPIO.HIGH)
-    GPIO.output(IN2, GPIO.LOW)
-    GPIO.output(IN3, GPIO.HIGH)
-    GPIO.output(IN4, GPIO.LOW)
-    stop_motor_after_timeout(timeout)
+    if DEBUG:
+        log("🚀 Moving forward")
+    _drive_for(FORWARD, timeout)
 
 def motor_backward(timeout=0.2):
     if not system_running:
         return
-    print("🔄 Moving backward")
-    GPIO.output(IN1, GPIO.LOW)
-    GPIO.output(IN2, GPIO.HIGH)
-    GPIO.output(IN3, GPIO.LOW)
-    GPIO.output(IN4, GPIO.HIGH)
-    stop_motor_after_timeout(timeout)
+    if DEBUG:
+        log("🔄 Moving backward")
+    _drive_for(BACKWARD, timeout)
 
 def motor_left(timeout=0.2):
     if not system_running:
         return
-    print("⬅️ Turning left")
-    GPIO.output(IN1, GPIO.LOW)
-    GPIO.output(IN2, GPIO.HIGH)
-    GPIO.output(IN3, GPIO.HIGH)
-    GPIO.output(IN4, GPIO.LOW)
-    stop_motor_after_timeout(timeout)
+    if DEBUG:
+        log("⬅️ Turning left")
+    _drive_for(LEFT, timeout)
 
 def motor_right(timeout=0.2):
     if not system_running:
         return
-    print("➡️ Turning right")
-    GPIO.output(IN1, GPIO.HIGH)
-    GPIO.output(IN2, GPIO.LOW)
-    GPIO.output(IN3, GPIO.LOW)
-    GPIO.output(IN4, GPIO.HIGH)
-    stop_motor_after_timeout(timeout)
+    if DEBUG:
+        log("➡️ Turning right")
+    _drive_for(RIGHT, timeout)
 
 def motor_stop():
-    print("🛑 Stopping motors")
-    GPIO.output(IN1, GPIO.LOW)
-    GPIO.output(IN2, GPIO.LOW)
-    GPIO.output(IN3, GPIO.LOW)
-    GPIO.output(IN4, GPIO.LOW)
+    if DEBUG:
+        log("🛑 Stopping motors")
+    _drive(STOP)
+
+threading.Thread(target=_motor_stop_worker, daemon=True).start()
+
+# Arrow key -> (blocked_directions index to check or None, motor function,
+# message when that direction is blocked)
+_HANDLERS = {
+    "ArrowUp": (0, motor_forward, "🚫 Obstacle ahead!"),
+    "ArrowDown": (1, motor_backward, "🚫 Obstacle behind!"),
+    "ArrowLeft": (None, motor_left, None),
+    "ArrowRight": (None, motor_right, None),
+}
 
 # === Obstacle monitoring thread ===
+@njit(nogil=True, cache=True)
+def _update_blocked(distances, blocked, threshold):
+    """Set the [front, back] blocked flags from one [front, back] sample"""
+    blocked[0] = distances[0] < threshold
+    blocked[1] = distances[1] < threshold
+
 def monitor_obstacles():
     global system_running
+    start_log_writer()
+    next_report = 0.0
+    # Compile before the first sample arrives, not while handling it
+    _update_blocked(np.full(2, 100.0), np.zeros(2, dtype=np.int8), distence)
     while system_running:
         try:
-            front, back = shared_distances[0], shared_distances[1]
-            blocked_directions[0] = 1 if front < distence else 0
-            blocked_directions[1] = 1 if back < distence else 0
-            print(f"📏 Front: {front:.2f} cm | Back: {back:.2f} cm | Blocked: F={blocked_directions[0]} B={blocked_directions[1]}")
-            time.sleep(0.5)
+            # Sleep until the ultrasonic process publishes a sample
+            if not new_distance_sample.wait(1.0):
+                continue
+            new_distance_sample.clear()
+
+            sample = distance_ring[latest_slot(distance_ring_tail)]
+            _update_blocked(sample, blocked_directions, distence)
+
+            now = time.monotonic()
+            if now >= next_report:
+                log(f"📏 Front: {sample[0]:.2f} cm | Back: {sample[1]:.2f} cm | Blocked: F={blocked_directions[0]} B={blocked_directions[1]}")
+                next_report = now + 1.0
         except Exception as e:
             if system_running:
-                print(f"⚠️ Error in obstacle monitoring: {e}")
+                log(f"⚠️ Error in obstacle monitoring: {e}")
             time.sleep(1)
 
 # === MQTT message handler ===
+def start_command_loop():
+    """Start the event loop that runs handle_message in its own thread"""
+    global command_loop
+    command_loop = asyncio.new_event_loop()
+    threading.Thread(target=command_loop.run_forever, daemon=True).start()
+
 def customCallback(client, userdata, message):
-    global motor_timer, system_running, video_process
+    """Queue the message on the command loop so the SDK callback thread is free at once"""
+    if not system_running:
+        return
+    asyncio.run_coroutine_threadsafe(handle_message(message.payload), command_loop)
+
+async def handle_message(raw_payload):
+    global system_running
     
     if not system_running:
         return
         
     try:
-        payload = message.payload.decode()
-        print(f"📩 Received message: {payload}")
+        if DEBUG:
+            log(f"📩 Received message: {raw_payload.decode(errors='replace')}")
         
-        # Try to parse as JSON for system commands
+        # Try to parse as JSON for system commands (orjson reads the bytes as they are)
         try:
-            msg_data = json.loads(payload)
+            msg_data = orjson.loads(raw_payload)
+            msg_type = msg_data.get("type")
+            key = msg_data.get("key")
             
             # Handle system commands
-            if msg_data.get("type") == "disconnect":
-                print("🔌 Disconnect command received")
+            if msg_type == "disconnect":
+                log("🔌 Disconnect command received")
                 disconnect_system()
                 return
-            elif msg_data.get("type") == "reconnect":
-                print("🔄 Reconnect command received")
+            elif msg_type == "reconnect":
+                log("🔄 Reconnect command received")
                 reconnect_system()
                 return
-            if msg_data.get("type") == "videocall_on" and msg_data.get("callId"):
+            if msg_type == "videocall_on" and msg_data.get("callId"):
                 call_id = msg_data["callId"]
-                if video_process is None:
-                    print(f"📞 Starting video call process with Call ID: {call_id}")
-                    video_process = subprocess.Popen(["python3", "video_call_manager.py", call_id])
+                log(f"📞 Starting video call with Call ID: {call_id}")
+                send_video_command({"action": "start", "callId": call_id})
                 return
 
-            elif msg_data.get("type") == "videocall_off":
-                if video_process and video_process.poll() is None:
-                    print("📴 Stopping video call process...")
-                    video_process.send_signal(signal.SIGINT)
-                    video_process.wait()
-                    video_process = None
+            elif msg_type == "videocall_off":
+                log("📴 Stopping video call...")
+                send_video_command({"action": "stop"})
                 return
 
             # Handle regular commands with timestamp checking
-            if msg_data.get("key") and msg_data.get("timestamp"):
-                if msg_data.get("duration") is None:
-                    msg_data["duration"] = 0.2
-                command_time = msg_data["timestamp"]
+            command_time = msg_data.get("timestamp")
+            if key and command_time:
+                duration = msg_data.get("duration")
+                if duration is None:
+                    duration = 0.2
                 current_time = int(time.time() * 1000)  # Current time in milliseconds
                 time_diff = current_time - command_time
-                duration = msg_data["duration"]
                 
                 # Check if command is too old (e.g., older than 2 seconds)
                 if time_diff > 2000:
-                    print(f"⏰ Command too old, ignoring. Age: {time_diff}ms")
+                    log(f"⏰ Command too old, ignoring. Age: {time_diff}ms")
                     return
                 
-                key = msg_data["key"]
-                
-                if key == "ArrowUp":
-                    if blocked_directions[0]:
-                        print("🚫 Obstacle ahead!")
-                        motor_stop()
-                        return
-                    motor_forward(timeout=duration)
-
-                elif key == "ArrowDown": 
-                    if blocked_directions[1]:
-                        print("🚫 Obstacle behind!")
-                        motor_stop()
-                        return
-                    motor_backward(timeout=duration)
-
-                elif key == "ArrowLeft":
-                    motor_left(timeout=duration)
-
-                elif key == "ArrowRight":
-                    motor_right(timeout=duration)
-
-                else:
-                    print("❓ Unknown command key")
+                entry = _HANDLERS.get(key)
+                if entry is None:
+                    log("❓ Unknown command key")
                     motor_stop()
-                    if motor_timer:
-                        motor_timer.cancel()
+                    cancel_motor_stop()
+                    return
+
+                # Both flags in one 2-byte read, so every check below sees the
+                # same snapshot of what monitor_obstacles last wrote
+                blocked = struct.unpack_from("<bb", blocked_shm.buf, 0)
+                blocked_index, move, obstacle_message = entry
+                if blocked_index is not None and blocked[blocked_index]:
+                    log(obstacle_message)
+                    motor_stop()
+                    return
+                move(timeout=duration)
                 return
 
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             pass  # Not a JSON message, handle as regular control command
         
     #     # Handle legacy string format commands (without timestamp)
@@ -335,7 +509,7 @@ def customCallback(client, userdata, message):
     #             motor_timer.cancel()
                 
     except Exception as e:
-        print(f"⚠️ Error processing MQTT message: {e}")
+        log(f"⚠️ Error processing MQTT message: {e}")
 
 
 
@@ -346,6 +520,7 @@ def main():
     # Set up signal handlers
     signal.signal(signal.SIGTERM, signal_handler)
     signal.signal(signal.SIGINT, signal_handler)
+    start_log_writer()
     
     try:
         # === Load MQTT credentials from file ===
@@ -381,14 +556,20 @@ def main():
         mqtt_client.configureMQTTOperationTimeout(5)
 
         # Connect and subscribe
+        start_command_loop()
         print(f"🔗 Connecting to {endpoint} using WebSocket...")
         mqtt_client.connect()
         mqtt_client.subscribe(topic, 1, customCallback)
         print(f"✅ Subscribed to {topic}. Waiting for messages...")
+        threading.Thread(target=drain_publish_queue, daemon=True).start()
 
         # === Start background processes ===
+        print("📞 Starting video call manager...")
+        start_video_manager()
+
         print("🚀 Starting ultrasonic sensor process...")
-        ultrasonic_process = multiprocessing.Process(target=measure_distance, args=(shared_distances,))
+        ultrasonic_process = multiprocessing.Process(target=measure_distance,
+                                                     args=(distance_ring, distance_ring_tail, new_distance_sample))
         ultrasonic_process.start()
 
         print("🚧 Starting obstacle monitoring process...")
@@ -396,18 +577,9 @@ def main():
         obstacle_process.start()
 
         print("Starting battery precentage monitoring process...")
-        mqtt_config = {
-            "endpoint": endpoint,
-            "access_key": aws_access_key,
-            "secret_key": aws_secret_key,
-            "session_token": aws_session_token,
-            "ca_path": "../cert/AmazonRootCA1.pem",
-            "topic": topic
-        }
-
         read_battery_precentage_process = multiprocessing.Process(
             target=read_battery_precentage.read_serial_batter_status,
-            args=(mqtt_config,)
+            args=(publish_queue, topic)
         )
         read_battery_precentage_process.start()
 
@@ -424,20 +596,45 @@ def main():
         print("🎮 Control commands: ArrowUp, ArrowDown, ArrowLeft, ArrowRight")
 
         # === Keep the main thread alive ===
+        started_at = dict.fromkeys(("ultrasonic", "obstacle", "battery"), time.monotonic())
         while system_running:
             try:
-                # Check if processes are still alive
-                if ultrasonic_process and not ultrasonic_process.is_alive():
-                    print("⚠️ Ultrasonic process died, restarting...")
-                    ultrasonic_process = multiprocessing.Process(target=measure_distance, args=(shared_distances,))
-                    ultrasonic_process.start()
-                
-                if obstacle_process and not obstacle_process.is_alive():
-                    print("⚠️ Obstacle monitoring process died, restarting...")
-                    obstacle_process = multiprocessing.Process(target=monitor_obstacles)
-                    obstacle_process.start()
-                
-                time.sleep(5)  # Check every 5 seconds
+                # Sleep until a child process exits (its sentinel becomes ready)
+                children = {
+                    ultrasonic_process.sentinel: "ultrasonic",
+                    obstacle_process.sentinel: "obstacle",
+                    read_battery_precentage_process.sentinel: "battery",
+                }
+                ready = multiprocessing.connection.wait(list(children))
+                if not system_running:
+                    break
+
+                for sentinel in ready:
+                    name = children[sentinel]
+                    delay = started_at[name] + RESTART_BACKOFF - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+
+                    if name == "ultrasonic":
+                        print("⚠️ Ultrasonic process died, restarting...")
+                        ultrasonic_process.join()
+                        ultrasonic_process = multiprocessing.Process(target=measure_distance,
+                                                                     args=(distance_ring, distance_ring_tail, new_distance_sample))
+                        ultrasonic_process.start()
+                    elif name == "obstacle":
+                        print("⚠️ Obstacle monitoring process died, restarting...")
+                        obstacle_process.join()
+                        obstacle_process = multiprocessing.Process(target=monitor_obstacles)
+                        obstacle_process.start()
+                    else:
+                        print("⚠️ Battery monitoring process died, restarting...")
+                        read_battery_precentage_process.join()
+                        read_battery_precentage_process = multiprocessing.Process(
+                            target=read_battery_precentage.read_serial_batter_status,
+                            args=(publish_queue, topic)
+                        )
+                        read_battery_precentage_process.start()
+                    started_at[name] = time.monotonic()
                 
             except KeyboardInterrupt:
                 print("\n🛑 Keyboard interrupt received")
@@ -1,49 +1,114 @@
 # mqtt_monitor.py
-import json
+import orjson
 import time
+import queue
 from threading import Event, Thread
 from data_manager import store_data_locally
 
+# How long one browser-side wait lasts before the progress line is printed
+HEARTBEAT_SECONDS = 30
+
+# Resolves with localStorage['webSocketData'] as soon as it holds a connect
+# message with a token, or with null once the wait (arguments[0] ms) is over.
+# setItem is wrapped once per page so writes from the page itself are seen
+# immediately; the 'storage' event covers writes from other tabs.
+WAIT_FOR_CONNECT_SCRIPT = """
+const done = arguments[arguments.length - 1];
+const waitMs = arguments[0];
+const KEY = 'webSocketData';
+const EVENT = 'robot-websocket-data';
+
+function isConnect(raw) {
+    try {
+        const data = JSON.parse(raw);
+        return !!(data && data.type === 'connect' && data.user && data.user.token);
+    } catch (e) {
+        return false;
+    }
+}
+
+const current = localStorage.getItem(KEY);
+if (isConnect(current)) {
+    done(current);
+    return;
+}
+
+if (!Storage.prototype.__robotSetItem) {
+    const setItem = Storage.prototype.setItem;
+    Storage.prototype.__robotSetItem = setItem;
+    Storage.prototype.setItem = function (key, value) {
+        setItem.apply(this, arguments);
+        if (this === window.localStorage && key === KEY) {
+            window.dispatchEvent(new CustomEvent(EVENT, {detail: String(value)}));
+        }
+    };
+}
+
+let timer = null;
+function finish(value) {
+    clearTimeout(timer);
+    window.removeEventListener(EVENT, onSetItem);
+    window.removeEventListener('storage', onStorage);
+    done(value);
+}
+function onSetItem(event) {
+    if (isConnect(event.detail)) finish(event.detail);
+}
+function onStorage(event) {
+    if (event.key === KEY && isConnect(event.newValue)) finish(event.newValue);
+}
+window.addEventListener(EVENT, onSetItem);
+window.addEventListener('storage', onStorage);
+timer = setTimeout(() => finish(null), waitMs);
+"""
+
 def wait_for_mqtt_message(driver, robot_id, timeout=18000):
     """Event-driven wait for MQTT authentication message."""
     print(f"🔄 Waiting for MQTT message for robot {robot_id}...")
     print(f"⏰ Timeout set to {timeout//3600} hours")
 
-    result = {"data": None}
-    done = Event()
+    # The watcher hands the message over through a queue; the main thread
+    # blocks on get() and sets `stop` once it gives up waiting
+    results = queue.Queue(maxsize=1)
+    stop = Event()
 
     def watch_local_storage():
-        check_count = 0
-        while not done.is_set():
+        # The browser waits for the write itself; Selenium only has to allow
+        # a bit longer than one heartbeat for the script to answer. While the
+        # request is outstanding this thread sits in a socket read, which
+        # does not hold the GIL
+        driver.set_script_timeout(HEARTBEAT_SECONDS + 10)
+        while not stop.is_set():
             try:
-                websocket_data = driver.execute_script("return localStorage.getItem('webSocketData');")
+                remaining = timeout - (time.time() - start_time)
+                if remaining <= 0:
+                    return
+                wait_ms = int(min(HEARTBEAT_SECONDS, remaining) * 1000)
+                websocket_data = driver.execute_async_script(WAIT_FOR_CONNECT_SCRIPT, wait_ms)
 
+                # WAIT_FOR_CONNECT_SCRIPT only answers with a connect message
+                # or null, so there is nothing stale to re-parse here
                 if websocket_data:
-                    data = json.loads(websocket_data)
+                    data = orjson.loads(websocket_data)
 
-                    if data.get("type") == "connect" and data.get("user") and data["user"].get("token"):
+                    if data.get("type") == "connect" and (data.get("user") or {}).get("token"):
                         print(f"\n📨 WebSocket data received: {data}")
                         print("🎉 MQTT authentication message received!")
                         print(f"🔑 ID Token: {data['user']['token'][:20]}...")
                         print(f"⏱️ Timestamp: {data.get('timestamp')}")
-                        
-                        if store_data_locally(data):
-                            result["data"] = data
-                        else:
+
+                        if not store_data_locally(data):
                             print("⚠️ Failed to store data but continuing...")
-                            result["data"] = data
 
-                        done.set()
+                        results.put(data)
                         return
 
-                check_count += 1
-                if check_count % 15 == 0: # if check_count is a multiple of 15
-                    elapsed = int(time.time() - start_time) # calculate elapsed time
-                    remaining = timeout - elapsed # calculate remaining time
-                    print(f"⏳ Waiting... {elapsed//60}m elapsed, {remaining//60}m remaining") # print elapsed and remaining time
-                time.sleep(2) # Check every 2 seconds
+                elapsed = int(time.time() - start_time) # calculate elapsed time
+                remaining = timeout - elapsed # calculate remaining time
+                print(f"⏳ Waiting... {elapsed//60}m elapsed, {remaining//60}m remaining") # print elapsed and remaining time
 
             except Exception as e:
+                # e.g. the page navigated away while the script was waiting
                 print(f"\n⚠️ Error checking for MQTT message: {e}")
                 time.sleep(5)
 
@@ -51,11 +116,15 @@ def wait_for_mqtt_message(driver, robot_id, timeout=18000):
     thread = Thread(target=watch_local_storage)
     thread.start()
 
-    done.wait(timeout)
+    try:
+        data = results.get(timeout=timeout)
+    except queue.Empty:
+        data = None
+    stop.set()  # Stops the watcher after a timeout
     thread.join()
 
-    if result["data"]:
-        return result["data"]
+    if data:
+        return data
 
     print(f"\n⏰ Timeout: No MQTT message received within {timeout//3600} hours")
-    return None
\ No newline at end of file
+    return None
@@ -1,44 +1,40 @@
 import time
-from AWSIoTPythonSDK.MQTTLib import AWSIoTMQTTClient
 
 
-def read_serial_batter_status(mqtt_config, port='/dev/ttyUSB0', baudrate=9600, timeout=1):
+def read_serial_batter_status(publish_queue, topic, port='/dev/ttyUSB0', baudrate=9600, timeout=1):
     """
     Reads battery percentage from serial and publishes to AWS IoT MQTT topic.
+
+    Publishes go through publish_queue as (topic, payload, qos) tuples and are
+    sent by the robot control process's MQTT client, so this process needs no
+    connection of its own.
+
+    The loop blocks in ser.readline() and publishes a reading when it differs
+    from the last published one, or at least once a minute otherwise.
     """
     import serial
     import json
 
     print("🔋 Battery percentage monitoring started...")
 
-    # Setup AWS MQTT client inside the process
-    mqtt_client = AWSIoTMQTTClient("batteryClient", useWebsocket=True)
-    mqtt_client.configureEndpoint(mqtt_config["endpoint"], 443)
-    mqtt_client.configureCredentials(mqtt_config["ca_path"])
-    mqtt_client.configureIAMCredentials(
-        mqtt_config["access_key"],
-        mqtt_config["secret_key"],
-        mqtt_config["session_token"]
-    )
-    mqtt_client.configureConnectDisconnectTimeout(10)
-    mqtt_client.configureMQTTOperationTimeout(5)
-
-    mqtt_client.connect()
-
     # Setup Serial
     ser = serial.Serial(port, baudrate, timeout=timeout)
 
+    last_value = None
+    last_publish = time.monotonic()
+
     try:
         while True:
+            # Blocks for up to `timeout` seconds waiting for the next reading
             line = ser.readline().decode('utf-8', errors='ignore').strip()
-            if line:
+            if line and (line != last_value or time.monotonic() - last_publish >= 60):
                 payload = json.dumps({"battery_percentage": line})
                 print(f"🔋 Publishing: {payload}")
-                mqtt_client.publish(mqtt_config["topic"], payload, 0)
-                time.sleep(60)
+                publish_queue.put((topic, payload, 0))
+                last_value = line
+                last_publish = time.monotonic()
     except KeyboardInterrupt:
         print("❌ Battery monitoring interrupted")
     finally:
         ser.close()
-        mqtt_client.disconnect()
-        print("🔌 Serial and MQTT disconnected")
+        print("🔌 Serial disconnected")
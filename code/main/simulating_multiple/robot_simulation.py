@@ -1,7 +1,10 @@
 import json
+import orjson
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import time
 import math
 import os
@@ -9,6 +12,17 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 from AWSIoTPythonSDK.MQTTLib import AWSIoTMQTTClient
 import random
+from itertools import cycle
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional, the NumPy step does the same work
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        return lambda func: func
 
 # --- Certificate Paths (relative to the script) ---
 # Ensure these files are in your 'cert' folder.
@@ -21,6 +35,21 @@ CERTIFICATE_PATH = os.path.join(os.path.dirname(__file__), "cert", "device-certi
 AWS_IOT_ENDPOINT = "a2cdp9hijgdiig-ats.iot.ap-southeast-2.amazonaws.com" # e.g., "xxxxxxxxxxxxxx-ats.iot.us-east-1.amazonaws.com"
 AWS_REGION = "ap-southeast-2" # e.g., "us-east-1" (optional for certificate auth, but good to keep consistent)
 
+# Most robots that connect at the same time; the rest wait for a free worker
+MAX_CONNECT_WORKERS = 32
+
+# Topic for batched robot telemetry (leave empty to publish nothing). Every
+# TELEMETRY_MS the state of all connected robots goes out as JSON arrays,
+# split so one publish stays under TELEMETRY_MAX_BYTES (about one TCP segment)
+TELEMETRY_TOPIC = ""
+TELEMETRY_MS = 200
+TELEMETRY_MAX_BYTES = 1400
+
+# Robots take these colours in turn, so the first len(ROBOT_COLORS) robots
+# never share one
+ROBOT_COLORS = ["red", "green", "blue", "purple", "orange", "brown", "pink", "cyan"]
+_robot_colors = cycle(ROBOT_COLORS)
+
 @dataclass
 class Robot:
     """Represents a robot in the simulation"""
@@ -28,12 +57,13 @@ class Robot:
     x: float = 400  # Canvas position
     y: float = 300
     angle: float = 0  # Rotation angle in degrees
-    color: str = "blue"
-    mqtt_client: Optional[AWSIoTMQTTClient] = None
+    color: str = ""  # Next colour from ROBOT_COLORS when not given
+    mqtt_client: Optional[AWSIoTMQTTClient] = None  # The shared client while subscribed to topic
     topic: str = ""
     status: str = "disconnected"
     battery_level: float = 100.0
     last_command: str = ""
+    display_command: str = "N/A"  # What the robot list shows for last_command
     last_command_time: float = 0
     # Movement state
     is_moving: bool = False
@@ -44,12 +74,153 @@ class Robot:
     
     # Store endpoint for consistency, although certificates are primary auth
     aws_endpoint: str = ""
+
+    # Canvas item IDs ("body", "arrow", "label", "status", "battery_outline",
+    # "battery_fill"), created once and moved on every redraw
+    canvas_items: Dict[str, int] = field(default_factory=dict)
     
     def __post_init__(self):
-        if not self.color or self.color == "blue":
-            # Generate random color for each robot
-            colors = ["red", "green", "blue", "purple", "orange", "brown", "pink", "cyan"]
-            self.color = random.choice(colors)
+        if not self.color:
+            self.color = next(_robot_colors)
+
+# Movement types as stored in RobotState.movement_type
+MOVE_NONE, MOVE_FORWARD, MOVE_BACKWARD, MOVE_LEFT, MOVE_RIGHT = range(5)
+MOVEMENT_NAMES = {MOVE_NONE: "", MOVE_FORWARD: "forward", MOVE_BACKWARD: "backward",
+                  MOVE_LEFT: "left", MOVE_RIGHT: "right"}
+KEY_MOVEMENTS = {"ArrowUp": MOVE_FORWARD, "ArrowDown": MOVE_BACKWARD,
+                 "ArrowLeft": MOVE_LEFT, "ArrowRight": MOVE_RIGHT}
+
+FRAME_SECONDS = 0.05  # Physics step, approximately 20 FPS
+RENDER_MS = 100  # Redraw period of the canvas and robot list, 10 FPS
+INBOX_SIZE = 4096  # MQTT messages held for the physics tick; the oldest are dropped beyond this
+MOVE_DISTANCE = 100  # Pixels covered by one forward/backward command
+TURN_DEGREES = 10  # Degrees turned by one left/right command
+ROBOT_MARGIN = 20  # Closest a robot centre gets to the canvas edge
+
+# cos/sin of every whole degree, for drawing the heading arrow. Rounding the
+# heading to 1 degree is invisible at arrow size; the physics step keeps
+# exact trig so headings do not drift
+HEADING_COS = np.cos(np.deg2rad(np.arange(360))).tolist()
+HEADING_SIN = np.sin(np.deg2rad(np.arange(360))).tolist()
+
+def _step_vectorized(x, y, angle, is_moving, movement_type, start_time, duration, target_angle,
+                     battery, connected, now, max_x, max_y):
+    """Advance every robot by one frame, in place, through boolean masks over the state arrays"""
+    # Finish movements whose duration is over; rotations end exactly on
+    # their target angle
+    rotating = (movement_type == MOVE_LEFT) | (movement_type == MOVE_RIGHT)
+    done = is_moving & (now - start_time >= duration)
+    finished_turn = done & rotating
+    angle[finished_turn] = target_angle[finished_turn] % 360
+    is_moving[done] = False
+    movement_type[done] = MOVE_NONE
+    rotating &= ~done
+
+    # Fraction of the whole command covered in this frame. Movements
+    # still running have duration > 0, otherwise they would be done
+    frame_fraction = np.zeros(len(x))
+    np.divide(FRAME_SECONDS, duration, out=frame_fraction, where=is_moving)
+
+    # Forward/backward: move along the heading (reversed when backing
+    # up), kept within canvas bounds (adjusting for robot size)
+    linear = is_moving & ((movement_type == MOVE_FORWARD) | (movement_type == MOVE_BACKWARD))
+    if linear.any():
+        heading = np.deg2rad(angle[linear] + 180 * (movement_type[linear] == MOVE_BACKWARD))
+        distance = MOVE_DISTANCE * frame_fraction[linear]
+        x[linear] = np.maximum(ROBOT_MARGIN, np.minimum(max_x, x[linear] + distance * np.cos(heading)))
+        y[linear] = np.maximum(ROBOT_MARGIN, np.minimum(max_y, y[linear] + distance * np.sin(heading)))
+
+    # Left/right: interpolate the rotation smoothly over the duration
+    turning = is_moving & rotating
+    if turning.any():
+        direction = np.where(movement_type[turning] == MOVE_LEFT, -1.0, 1.0)
+        angle[turning] = (angle[turning] + direction * TURN_DEGREES * frame_fraction[turning]) % 360
+
+    # Simulate battery drain for connected robots
+    draining = connected & (battery > 0)
+    battery[draining] = np.maximum(battery[draining] - 0.01, 0)  # Slow drain
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _step(x, y, angle, is_moving, movement_type, start_time, duration, target_angle,
+          battery, connected, now, max_x, max_y):
+    """Advance every robot by one frame, in place, in a single compiled loop (same rules as _step_vectorized)"""
+    for i in range(x.shape[0]):
+        if is_moving[i]:
+            kind = movement_type[i]
+            if now - start_time[i] >= duration[i]:
+                is_moving[i] = False
+                movement_type[i] = MOVE_NONE
+                if kind == MOVE_LEFT or kind == MOVE_RIGHT:
+                    angle[i] = target_angle[i] % 360
+            else:
+                frame_fraction = FRAME_SECONDS / duration[i]
+                if kind == MOVE_FORWARD or kind == MOVE_BACKWARD:
+                    heading = math.radians(angle[i] + 180) if kind == MOVE_BACKWARD else math.radians(angle[i])
+                    distance = MOVE_DISTANCE * frame_fraction
+                    x[i] = max(ROBOT_MARGIN, min(max_x, x[i] + distance * math.cos(heading)))
+                    y[i] = max(ROBOT_MARGIN, min(max_y, y[i] + distance * math.sin(heading)))
+                elif kind == MOVE_LEFT:
+                    angle[i] = (angle[i] - TURN_DEGREES * frame_fraction) % 360
+                elif kind == MOVE_RIGHT:
+                    angle[i] = (angle[i] + TURN_DEGREES * frame_fraction) % 360
+
+        # Simulate battery drain for connected robots
+        if connected[i] and battery[i] > 0:
+            battery[i] = max(battery[i] - 0.01, 0.0)
+
+# Without numba the plain-Python loop above would be slower than the masks
+step_robots = _step if HAVE_NUMBA else _step_vectorized
+
+class RobotState:
+    """Per-robot simulation state as parallel NumPy arrays (one slot per robot)
+
+    The physics step works on whole arrays instead of looping over Robot
+    objects; Robot keeps a copy of these fields for drawing and the list view.
+    """
+
+    FIELDS = {
+        "x": np.float64,
+        "y": np.float64,
+        "angle": np.float64,
+        "is_moving": np.bool_,
+        "movement_type": np.int8,
+        "movement_start_time": np.float64,
+        "movement_duration": np.float64,
+        "target_angle": np.float64,
+        "battery_level": np.float64,
+    }
+
+    def __init__(self, capacity: int = 16):
+        self.count = 0
+        for name, dtype in self.FIELDS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+
+    def add(self, robot: Robot) -> int:
+        """Append a robot's state, doubling the arrays when full, and return its index"""
+        if self.count == len(self.x):
+            for name in self.FIELDS:
+                old = getattr(self, name)
+                grown = np.zeros(len(old) * 2, dtype=old.dtype)
+                grown[:self.count] = old[:self.count]
+                setattr(self, name, grown)
+
+        index = self.count
+        self.x[index] = robot.x
+        self.y[index] = robot.y
+        self.angle[index] = robot.angle
+        self.is_moving[index] = robot.is_moving
+        self.movement_type[index] = next(
+            (code for code, name in MOVEMENT_NAMES.items() if name == robot.movement_type), MOVE_NONE)
+        self.movement_start_time[index] = robot.movement_start_time
+        self.movement_duration[index] = robot.movement_duration
+        self.target_angle[index] = robot.target_angle
+        self.battery_level[index] = robot.battery_level
+        self.count += 1
+        return index
+
+    def clear(self):
+        """Forget all robots (the arrays are kept for reuse)"""
+        self.count = 0
 
 class RobotSimulation:
     def __init__(self):
@@ -58,9 +229,38 @@ class RobotSimulation:
         self.root.geometry("1200x800")
         
         self.robots: Dict[str, Robot] = {}
+        # Simulation state lives in self.state; self.robot_index maps a robot
+        # ID to its slot. Only the Tk main thread touches either, or the
+        # widgets: MQTT messages wait in self.inbox until the physics tick
+        # handles them, and connect workers hand GUI updates over with root.after
+        self.state = RobotState()
+        self.robot_index: Dict[str, int] = {}
+        self.inbox = deque(maxlen=INBOX_SIZE)
+        if HAVE_NUMBA:
+            self.warm_up_step()
         self.canvas = None
         self.running = False
-        self.animation_thread = None
+        # root.after jobs of the physics and render ticks while running;
+        # render_dirty is set by physics and cleared by render
+        self.physics_job = None
+        self.render_job = None
+        self.telemetry_job = None
+        self.physics_deadline = 0.0  # time.monotonic() at which the next physics step is due
+        self.render_dirty = False
+        self.connect_executor: Optional[ThreadPoolExecutor] = None
+        # One MQTT connection carries every robot's topic; topic_subscribers
+        # maps each subscribed topic to the IDs of the robots listening on it
+        self.shared_client: Optional[AWSIoTMQTTClient] = None
+        self.shared_client_lock = threading.Lock()
+        self.topic_subscribers: Dict[str, List[str]] = {}
+        # Certificate files are checked once here rather than on every
+        # connection attempt; the first missing one is remembered
+        self.missing_certificate = next(
+            (path for path in [ROOT_CA_PATH, PRIVATE_KEY_PATH, CERTIFICATE_PATH] if not os.path.exists(path)), None)
+        if self.missing_certificate:
+            print(f"⚠️ Certificate file not found: {self.missing_certificate}. Robots cannot connect until it is added and the simulation restarted.")
+        # Robot ID -> (status, battery bucket, command) last shown in the list
+        self.robot_rows: Dict[str, tuple] = {}
         
         self.setup_gui()
         
@@ -138,8 +338,11 @@ class RobotSimulation:
         self.canvas = tk.Canvas(canvas_frame, bg="white", width=800, height=600)
         self.canvas.pack(fill=tk.BOTH, expand=True)
         
-        # Draw grid
+        # Draw grid (again whenever the canvas is resized)
+        self.grid_image = None
+        self.grid_item = None
         self.draw_grid()
+        self.canvas.bind("<Configure>", lambda event: self.draw_grid())
         
         # Status bar
         self.status_var = tk.StringVar()
@@ -148,19 +351,31 @@ class RobotSimulation:
         status_bar.pack(side=tk.BOTTOM, fill=tk.X)
         
     def draw_grid(self):
-        """Draw grid lines on canvas"""
+        """Draw grid lines on canvas as one background image item"""
         if not self.canvas:
             return
             
-        self.canvas.delete("grid")
         width = self.canvas.winfo_width()
         height = self.canvas.winfo_height()
+        if (self.grid_image is not None and self.grid_image.width() == width
+                and self.grid_image.height() == height):
+            return
         
-        # Draw grid lines every 50 pixels
+        # Draw grid lines every 50 pixels, 1 pixel wide; the rest of the
+        # image stays transparent over the white canvas
+        image = tk.PhotoImage(width=width, height=height)
         for i in range(0, width, 50):
-            self.canvas.create_line(i, 0, i, height, fill="lightgray", tags="grid")
+            image.put("lightgray", to=(i, 0, i + 1, height))
         for i in range(0, height, 50):
-            self.canvas.create_line(0, i, width, i, fill="lightgray", tags="grid")
+            image.put("lightgray", to=(0, i, width, i + 1))
+        
+        # Tk only keeps the image while Python holds a reference to it
+        self.grid_image = image
+        if self.grid_item is None:
+            self.grid_item = self.canvas.create_image(0, 0, anchor=tk.NW, image=image, tags="grid")
+            self.canvas.tag_lower(self.grid_item)
+        else:
+            self.canvas.itemconfig(self.grid_item, image=image)
             
     def load_robot_config(self):
         """Load robot configuration from JSON file"""
@@ -192,11 +407,10 @@ class RobotSimulation:
                     x=random.randint(100, 700),
                     y=random.randint(100, 500),
                     topic=user_data.get("topic", ""),
-                    color=random.choice(["red", "green", "blue", "purple", "orange", "brown", "pink", "cyan"]),
                     aws_endpoint=AWS_IOT_ENDPOINT # Assign the global endpoint
                 )
                 
-                self.robots[robot_id] = robot
+                self.add_robot(robot)
                 self.update_robot_list()
                 self.draw_robots()
                 
@@ -228,96 +442,202 @@ class RobotSimulation:
             aws_endpoint=AWS_IOT_ENDPOINT # Assign the global endpoint
         )
         
-        self.robots[robot_id] = robot
+        self.add_robot(robot)
         self.update_robot_list()
         self.draw_robots()
         
         self.status_var.set(f"Added manual robot: {robot_id} with topic: {topic}. Connect to activate.")
         
+    def warm_up_step(self):
+        """Compile the step kernel now so the first real frame is not held up by it"""
+        warm_up = RobotState(capacity=1)
+        step_robots(warm_up.x, warm_up.y, warm_up.angle, warm_up.is_moving, warm_up.movement_type,
+                    warm_up.movement_start_time, warm_up.movement_duration, warm_up.target_angle,
+                    warm_up.battery_level, np.zeros(1, dtype=np.bool_), 0.0, 0.0, 0.0)
+
+    def add_robot(self, robot: Robot):
+        """Register a robot and give it a slot in the state arrays"""
+        self.robot_index[robot.id] = self.state.add(robot)
+        self.robots[robot.id] = robot
+        self.create_robot_items(robot)
+
+    def sync_robots(self):
+        """Copy the simulated state back onto the Robot objects"""
+        n = self.state.count
+        xs = self.state.x[:n].tolist()
+        ys = self.state.y[:n].tolist()
+        angles = self.state.angle[:n].tolist()
+        moving = self.state.is_moving[:n].tolist()
+        movement_types = self.state.movement_type[:n].tolist()
+        batteries = self.state.battery_level[:n].tolist()
+
+        for robot_id, i in self.robot_index.items():
+            robot = self.robots[robot_id]
+            robot.x, robot.y, robot.angle = xs[i], ys[i], angles[i]
+            robot.is_moving = moving[i]
+            robot.movement_type = MOVEMENT_NAMES[movement_types[i]]
+            robot.battery_level = batteries[i]
+
+    def start_movement(self, robot: Robot, key: str, duration: float):
+        """Start the movement for an arrow key in the robot's state slot"""
+        i = self.robot_index[robot.id]
+        state = self.state
+        state.is_moving[i] = True
+        state.movement_start_time[i] = time.time()
+        state.movement_duration[i] = duration
+
+        movement_type = KEY_MOVEMENTS.get(key)
+        if movement_type is not None:
+            state.movement_type[i] = movement_type
+        if movement_type == MOVE_LEFT:
+            state.target_angle[i] = state.angle[i] - TURN_DEGREES  # Rotate left
+        elif movement_type == MOVE_RIGHT:
+            state.target_angle[i] = state.angle[i] + TURN_DEGREES  # Rotate right
+        return MOVEMENT_NAMES[state.movement_type[i]]
+
     def connect_all_robots(self):
         """Connect all robots to MQTT"""
+        # Workers are started on demand, so there are never more than
+        # min(MAX_CONNECT_WORKERS, robots waiting) of them
+        if self.connect_executor is None:
+            self.connect_executor = ThreadPoolExecutor(max_workers=MAX_CONNECT_WORKERS,
+                                                       thread_name_prefix="robot-connect")
+
         for robot_id, robot in self.robots.items():
             # Only attempt connection if endpoint is set and robot isn't already connected/connecting
             if robot.aws_endpoint != "YOUR_AWS_IOT_ENDPOINT" and robot.status in ["disconnected", "error"]:
-                threading.Thread(target=self.connect_robot, args=(robot,), daemon=True).start()
+                robot.status = "connecting..." # Queued robots are not submitted twice
+                self.connect_executor.submit(self.connect_robot, robot)
             elif robot.status == "connected":
                 print(f"Robot {robot.id} is already connected.")
             else:
                 print(f"Robot {robot.id} has an invalid endpoint or credentials for connection.")
                 
     def connect_robot(self, robot: Robot):
-        """Connect a single robot to MQTT using certificates"""
+        """Connect a single robot to MQTT using certificates
+
+        Runs on a connect_executor worker, so every GUI update is handed to
+        the Tk main thread with root.after.
+        """
         # Ensure only one connection attempt at a time for a robot
         if robot.mqtt_client and robot.status == "connected":
             return
             
         robot.status = "connecting..." # Indicate connection in progress
-        self.update_robot_list()
+        self.root.after(0, self.update_robot_list)
         
         try:
             # Validate essential configuration
             if (robot.aws_endpoint == "YOUR_AWS_IOT_ENDPOINT" or not robot.topic):
                 raise ValueError("AWS IoT endpoint or topic is not configured for this robot.")
 
-            # Check if all certificate files exist
-            for path in [ROOT_CA_PATH, PRIVATE_KEY_PATH, CERTIFICATE_PATH]:
-                if not os.path.exists(path):
-                    raise FileNotFoundError(f"Required certificate file not found: {path}")
+            # Certificate files were checked at start-up
+            if self.missing_certificate:
+                raise FileNotFoundError(f"Required certificate file not found: {self.missing_certificate}")
 
-            client_id = f"simulation_{robot.id}_{int(time.time())}"
-            robot.mqtt_client = AWSIoTMQTTClient(client_id) # No useWebsocket=True here, as certificate auth is typically over TCP
-            
-            robot.mqtt_client.configureEndpoint(robot.aws_endpoint, 8883) # Default MQTT port for cert auth
-            
-            # Configure certificates for mutual TLS authentication
-            robot.mqtt_client.configureCredentials(ROOT_CA_PATH, PRIVATE_KEY_PATH, CERTIFICATE_PATH)
-            
-            # Configure connection parameters
-            robot.mqtt_client.configureAutoReconnectBackoffTime(1, 32, 20)
-            robot.mqtt_client.configureOfflinePublishQueueing(-1)
-            robot.mqtt_client.configureDrainingFrequency(2)
-            robot.mqtt_client.configureConnectDisconnectTimeout(10)
-            robot.mqtt_client.configureMQTTOperationTimeout(5)
-            
-            # Connect and subscribe
-            robot.mqtt_client.connect()
-            robot.mqtt_client.subscribe(robot.topic, 1, lambda client, userdata, message: self.mqtt_callback(robot, message))
+            client = self.get_shared_client()
+            with self.shared_client_lock:
+                subscribers = self.topic_subscribers.setdefault(robot.topic, [])
+                first_subscriber = not subscribers
+                subscribers.append(robot.id)
+            if first_subscriber:
+                try:
+                    client.subscribe(robot.topic, 1, self.mqtt_callback)
+                except Exception:
+                    self.unsubscribe_robot(robot) # Forget the topic again
+                    raise
+            robot.mqtt_client = client
             
             robot.status = "connected"
-            self.update_robot_list()
+            self.root.after(0, self.update_robot_list)
             
             print(f"✅ Robot {robot.id} connected to topic: {robot.topic}")
             
         except FileNotFoundError as fnfe:
             robot.status = "error"
-            self.update_robot_list()
+            self.root.after(0, self.update_robot_list)
             print(f"❌ Certificate File Error for robot {robot.id}: {str(fnfe)}")
-            messagebox.showerror("Certificate Error", str(fnfe))
+            self.root.after(0, messagebox.showerror, "Certificate Error", str(fnfe))
         except Exception as e:
             robot.status = "error"
-            self.update_robot_list()
+            self.root.after(0, self.update_robot_list)
             print(f"❌ Failed to connect robot {robot.id}: {str(e)}")
-            messagebox.showerror("Connection Error", f"Failed to connect robot {robot.id}: {str(e)}\n\nPlease ensure your AWS IoT endpoint is correct and certificate files are valid.")
+            self.root.after(0, messagebox.showerror, "Connection Error", f"Failed to connect robot {robot.id}: {str(e)}\n\nPlease ensure your AWS IoT endpoint is correct and certificate files are valid.")
+            
+    def get_shared_client(self) -> AWSIoTMQTTClient:
+        """Return the MQTT client shared by all robots, connecting it on first use"""
+        with self.shared_client_lock:
+            if self.shared_client is not None:
+                return self.shared_client
+
+            client_id = f"sim_hub_{os.getpid()}_{int(time.time())}"
+            client = AWSIoTMQTTClient(client_id) # No useWebsocket=True here, as certificate auth is typically over TCP
+            
+            client.configureEndpoint(AWS_IOT_ENDPOINT, 8883) # Default MQTT port for cert auth
+            
+            # Configure certificates for mutual TLS authentication
+            client.configureCredentials(ROOT_CA_PATH, PRIVATE_KEY_PATH, CERTIFICATE_PATH)
             
-    def mqtt_callback(self, robot: Robot, message):
+            # Configure connection parameters
+            client.configureAutoReconnectBackoffTime(1, 32, 20)
+            client.configureOfflinePublishQueueing(-1)
+            client.configureDrainingFrequency(2)
+            client.configureConnectDisconnectTimeout(10)
+            client.configureMQTTOperationTimeout(5)
+            
+            client.connect()
+            self.shared_client = client
+            return client
+
+    def unsubscribe_robot(self, robot: Robot):
+        """Stop delivering a robot's topic to it; the shared connection stays up"""
+        with self.shared_client_lock:
+            subscribers = self.topic_subscribers.get(robot.topic, [])
+            if robot.id in subscribers:
+                subscribers.remove(robot.id)
+            last_subscriber = not subscribers
+            if last_subscriber:
+                self.topic_subscribers.pop(robot.topic, None)
+        if last_subscriber and robot.mqtt_client:
+            robot.mqtt_client.unsubscribeAsync(robot.topic)
+        robot.mqtt_client = None
+
+    def mqtt_callback(self, client, userdata, message):
+        """Queue an MQTT message for the robots on its topic (runs on the MQTT network thread)"""
+        # deque appends are thread-safe; all parsing and state changes happen
+        # in drain_inbox so the network thread goes straight back to the socket
+        received_at = time.time()
+        for robot_id in self.topic_subscribers.get(message.topic, ()):
+            self.inbox.append((robot_id, message.payload, received_at))
+
+    def drain_inbox(self):
+        """Handle every queued MQTT message, oldest first"""
+        while self.inbox:
+            robot_id, payload, received_at = self.inbox.popleft()
+            robot = self.robots.get(robot_id)
+            if robot is not None:  # Skip messages for robots cleared since
+                self.handle_command(robot, payload, received_at)
+
+    def handle_command(self, robot: Robot, raw_payload: bytes, received_at: float):
         """Handle MQTT message for a robot"""
         try:
-            payload = message.payload.decode()
+            payload = raw_payload.decode()
             print(f"📩 Robot {robot.id} received: {payload}")
             
             # Update robot state
             robot.last_command = payload
-            robot.last_command_time = time.time()
+            robot.display_command = payload # Show raw command if not JSON
+            robot.last_command_time = received_at
             
-            # Parse command
+            # Parse command (orjson reads the payload bytes directly)
             try:
-                msg_data = json.loads(payload)
+                msg_data = orjson.loads(raw_payload)
+                if isinstance(msg_data, dict):
+                    robot.display_command = msg_data.get("key", msg_data.get("type", "unknown"))
                 print(f"Robot {robot.id} parsed command: {msg_data}")
                 if msg_data.get("type") == "disconnect":
                     robot.status = "disconnected"
-                    if robot.mqtt_client:
-                        robot.mqtt_client.disconnect()
-                        robot.mqtt_client = None
+                    self.unsubscribe_robot(robot)
                     return
                     
                 if msg_data.get("type") == "videocall_on":
@@ -333,9 +653,9 @@ class RobotSimulation:
                     duration = msg_data.get("duration", 0.2)
                     key = msg_data["key"]
                     
-                    # Check if command is recent enough (2 seconds)
+                    # Check if command was recent enough (2 seconds) when it arrived
                     command_time = msg_data["timestamp"]
-                    current_time_ms = int(time.time() * 1000)
+                    current_time_ms = int(received_at * 1000)
                     time_diff = current_time_ms - command_time
                     
                     if time_diff > 2000:
@@ -343,23 +663,10 @@ class RobotSimulation:
                         return
                     
                     # Start movement
-                    robot.is_moving = True
-                    robot.movement_start_time = time.time()
-                    robot.movement_duration = duration
-                    
-                    if key == "ArrowUp":
-                        robot.movement_type = "forward"
-                    elif key == "ArrowDown":
-                        robot.movement_type = "backward"
-                    elif key == "ArrowLeft":
-                        robot.movement_type = "left"
-                        robot.target_angle = robot.angle - 10  # Rotate left
-                    elif key == "ArrowRight":
-                        robot.movement_type = "right"
-                        robot.target_angle = robot.angle + 10  # Rotate right
-                    print(f"Robot {robot.id} started {robot.movement_type} movement.")
+                    movement_type = self.start_movement(robot, key, duration)
+                    print(f"Robot {robot.id} started {movement_type} movement.")
                         
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 print(f"Robot {robot.id}: Received non-JSON payload: {payload}")
                 pass  # Not JSON, ignore
                 
@@ -370,12 +677,18 @@ class RobotSimulation:
         """Disconnect all robots from MQTT"""
         for robot in self.robots.values():
             if robot.mqtt_client:
-                try:
-                    robot.mqtt_client.disconnect()
-                    robot.mqtt_client = None
-                    robot.status = "disconnected"
-                except Exception as e:
-                    print(f"Error disconnecting robot {robot.id}: {e}")
+                robot.mqtt_client = None
+                robot.status = "disconnected"
+
+        # Closing the shared connection drops every subscription at once
+        with self.shared_client_lock:
+            client, self.shared_client = self.shared_client, None
+            self.topic_subscribers.clear()
+        if client is not None:
+            try:
+                client.disconnect()
+            except Exception as e:
+                print(f"Error disconnecting MQTT client: {e}")
                     
         self.update_robot_list()
         self.status_var.set("All robots disconnected")
@@ -383,6 +696,8 @@ class RobotSimulation:
     def clear_all_robots(self):
         """Clear all robots from simulation"""
         self.disconnect_all_robots()
+        self.state.clear()
+        self.robot_index.clear()
         self.robots.clear()
         self.update_robot_list()
         self.canvas.delete("robot")
@@ -390,34 +705,43 @@ class RobotSimulation:
         
     def update_robot_list(self):
         """Update the robot list display"""
-        # Clear existing items
-        for item in self.robot_tree.get_children():
-            self.robot_tree.delete(item)
+        self.sync_robots()
+
+        # Remove rows of robots that are gone
+        for robot_id in list(self.robot_rows):
+            if robot_id not in self.robots:
+                self.robot_tree.delete(robot_id)
+                del self.robot_rows[robot_id]
             
-        # Add robots
+        # Add new robots and update changed rows in place (rows use the robot
+        # ID as item ID). The battery is compared in 0.5% steps so the slow
+        # drain does not touch every row on every frame
         for robot_id, robot in self.robots.items():
-            battery_str = f"{robot.battery_level:.1f}%"
-            # Attempt to extract key from JSON, if not, show full payload
-            try:
-                if robot.last_command:
-                    cmd_data = json.loads(robot.last_command)
-                    last_cmd = cmd_data.get("key", cmd_data.get("type", "unknown"))
-                else:
-                    last_cmd = "N/A"
-            except json.JSONDecodeError:
-                last_cmd = robot.last_command # Show raw command if not JSON
+            row = (robot.status, int(robot.battery_level * 2), robot.display_command)
+            if self.robot_rows.get(robot_id) == row:
+                continue
             
-            self.robot_tree.insert("", "end", text=robot_id, 
-                                 values=(robot.status, battery_str, last_cmd))
+            values = (robot.status, f"{robot.battery_level:.1f}%", robot.display_command)
+            if robot_id in self.robot_rows:
+                self.robot_tree.item(robot_id, values=values)
+            else:
+                self.robot_tree.insert("", "end", iid=robot_id, text=robot_id, values=values)
+            self.robot_rows[robot_id] = row
                                  
     def start_simulation(self):
         """Start the simulation animation"""
         if self.running:
             return
             
+        # Physics and drawing both run on the Tk main thread, each on its own
+        # root.after cadence, so no other thread touches the widgets
         self.running = True
-        self.animation_thread = threading.Thread(target=self.animation_loop, daemon=True)
-        self.animation_thread.start()
+        self.render_dirty = True
+        self.physics_deadline = time.monotonic()
+        self.physics_job = self.root.after(0, self.tick_physics)
+        self.render_job = self.root.after(0, self.tick_render)
+        if TELEMETRY_TOPIC:
+            self.telemetry_job = self.root.after(TELEMETRY_MS, self.tick_telemetry)
         
         self.status_var.set("Simulation running...")
         
@@ -426,121 +750,139 @@ class RobotSimulation:
         if not self.running:
             return
         self.running = False
-        self.animation_thread.join(timeout=1) # Wait for thread to finish
-        if self.animation_thread.is_alive():
-            print("Warning: Animation thread did not terminate gracefully.")
+        for job in (self.physics_job, self.render_job, self.telemetry_job):
+            if job is not None:
+                self.root.after_cancel(job)
+        self.physics_job = self.render_job = self.telemetry_job = None
         self.status_var.set("Simulation stopped")
         
-    def animation_loop(self):
-        """Main animation loop"""
-        while self.running:
-            self.update_robot_positions()
-            # Use root.after to schedule GUI updates on the main thread
-            self.root.after(0, self.draw_robots)
-            self.root.after(0, self.update_robot_list)
-            time.sleep(0.05)  # Approximately 20 FPS
+    def tick_physics(self):
+        """Apply queued MQTT commands, advance the simulation by one frame and schedule the next one
+
+        While the simulation is stopped, messages wait in the inbox; movement
+        commands older than 2 seconds by then are ignored as before.
+        """
+        self.drain_inbox()
+        self.update_robot_positions()
+        self.render_dirty = True
+
+        # Schedule against a fixed deadline so the time spent in this tick
+        # does not stretch the frame period; when a whole frame behind,
+        # skip ahead instead of running several steps back to back
+        self.physics_deadline += FRAME_SECONDS
+        delay = self.physics_deadline - time.monotonic()
+        if delay < -FRAME_SECONDS:
+            self.physics_deadline = time.monotonic()
+            delay = 0
+        self.physics_job = self.root.after(max(0, int(delay * 1000)), self.tick_physics)
             
+    def tick_render(self):
+        """Redraw the canvas and robot list if physics moved on, and schedule the next redraw"""
+        if self.render_dirty:
+            self.render_dirty = False
+            self.draw_robots()
+            self.update_robot_list()
+        self.render_job = self.root.after(RENDER_MS, self.tick_render)
+            
+    def tick_telemetry(self):
+        """Publish the telemetry batch and schedule the next one"""
+        self.publish_telemetry()
+        self.telemetry_job = self.root.after(TELEMETRY_MS, self.tick_telemetry)
+
+    def publish_telemetry(self):
+        """Publish the state of all connected robots in as few QoS 0 messages as fit TELEMETRY_MAX_BYTES"""
+        client = self.shared_client
+        connected = [robot for robot in self.robots.values() if robot.status == "connected" and robot.mqtt_client]
+        if client is None or not connected:
+            return
+        self.sync_robots()
+
+        tx_batch: List[bytes] = []
+        batch_size = 2  # The enclosing brackets
+        for robot in connected:
+            entry = orjson.dumps({
+                "id": robot.id,
+                "x": round(robot.x, 1),
+                "y": round(robot.y, 1),
+                "angle": round(robot.angle, 1),
+                "battery": round(robot.battery_level, 1),
+                "moving": robot.is_moving,
+            })
+            if tx_batch and batch_size + len(entry) + 1 > TELEMETRY_MAX_BYTES:
+                self.publish_telemetry_batch(client, tx_batch)
+                tx_batch, batch_size = [], 2
+            tx_batch.append(entry)
+            batch_size += len(entry) + 1
+
+        self.publish_telemetry_batch(client, tx_batch)
+
+    def publish_telemetry_batch(self, client: AWSIoTMQTTClient, tx_batch: List[bytes]):
+        """Publish already-serialized robot entries as one JSON array"""
+        try:
+            client.publish(TELEMETRY_TOPIC, b"[" + b",".join(tx_batch) + b"]", 0)
+        except Exception as e:
+            print(f"⚠️ Error publishing telemetry: {e}")
+
     def update_robot_positions(self):
         """Update robot positions based on movement commands"""
         current_time = time.time()
-        
-        for robot in self.robots.values():
-            if robot.is_moving:
-                elapsed = current_time - robot.movement_start_time
-                
-                # Check if movement should have finished
-                if elapsed >= robot.movement_duration:
-                    robot.is_moving = False
-                    robot.movement_type = ""
-                    # Ensure final position/angle is set after full duration for rotation
-                    if robot.movement_type in ["left", "right"]:
-                        robot.angle = robot.target_angle % 360
-                    continue
-                    
-                # Calculate movement progress (linear for position, smooth for rotation)
-                # This ensures continuous movement rather than only at the end of the duration
-                
-                # For linear movement (forward/backward), calculate based on a small time delta
-                if robot.movement_type == "forward":
-                    speed_pixels_per_sec = 100 / robot.movement_duration # Calculate speed based on desired distance/duration
-                    distance_moved_in_frame = speed_pixels_per_sec * 0.05 # Assuming 0.05s per frame
-                    
-                    dx = distance_moved_in_frame * math.cos(math.radians(robot.angle))
-                    dy = distance_moved_in_frame * math.sin(math.radians(robot.angle))
-                    
-                    new_x = robot.x + dx
-                    new_y = robot.y + dy
-                    
-                    # Keep within canvas bounds (adjusting for robot size)
-                    robot.x = max(20, min(self.canvas.winfo_width() - 20, new_x))
-                    robot.y = max(20, min(self.canvas.winfo_height() - 20, new_y))
-                    
-                elif robot.movement_type == "backward":
-                    speed_pixels_per_sec = 100 / robot.movement_duration
-                    distance_moved_in_frame = speed_pixels_per_sec * 0.05
-                    
-                    dx = distance_moved_in_frame * math.cos(math.radians(robot.angle + 180))
-                    dy = distance_moved_in_frame * math.sin(math.radians(robot.angle + 180))
-                    
-                    new_x = robot.x + dx
-                    new_y = robot.y + dy
-                    
-                    robot.x = max(20, min(self.canvas.winfo_width() - 20, new_x))
-                    robot.y = max(20, min(self.canvas.winfo_height() - 20, new_y))
-                    
-                elif robot.movement_type in ["left", "right"]:
-                    # Interpolate rotation smoothly over the duration
-                    # Calculate angle change for this frame based on total rotation and remaining time
-                    
-                    # Target total rotation for a "left" or "right" command is 10 degrees as defined
-                    total_rotation_degrees = 10
-                    
-                    # Calculate how much angle should change in this frame (0.05s)
-                    angle_change_per_frame = (total_rotation_degrees / robot.movement_duration) * 0.05
-                    
-                    if robot.movement_type == "left":
-                        robot.angle -= angle_change_per_frame
-                    else: # "right"
-                        robot.angle += angle_change_per_frame
-                        
-                    # Normalize angle
-                    robot.angle = robot.angle % 360
-                    if robot.angle < 0:
-                        robot.angle += 360
-                        
-            # Simulate battery drain for connected robots
-            if robot.status == "connected" and robot.battery_level > 0:
-                robot.battery_level -= 0.01  # Slow drain
-                if robot.battery_level < 0:
-                    robot.battery_level = 0
-                
+        # Floats, like the warm-up call, so numba reuses its compiled version
+        max_x = float(self.canvas.winfo_width() - ROBOT_MARGIN)
+        max_y = float(self.canvas.winfo_height() - ROBOT_MARGIN)
+        connected = np.fromiter((self.robots[robot_id].status == "connected" for robot_id in self.robot_index),
+                                dtype=np.bool_, count=len(self.robot_index))
+
+        state = self.state
+        n = state.count
+        if n == 0:
+            return
+        step_robots(state.x[:n], state.y[:n], state.angle[:n], state.is_moving[:n], state.movement_type[:n],
+                    state.movement_start_time[:n], state.movement_duration[:n], state.target_angle[:n],
+                    state.battery_level[:n], connected, current_time, max_x, max_y)
+
     def draw_robots(self):
         """Draw all robots on canvas"""
-        self.canvas.delete("robot")
+        self.sync_robots()
         
         for robot in self.robots.values():
             self.draw_robot(robot)
             
+    def create_robot_items(self, robot: Robot):
+        """Create the canvas items for a robot; draw_robot only moves and recolours them"""
+        robot.canvas_items = {
+            # Robot body (circle)
+            "body": self.canvas.create_oval(0, 0, 0, 0, fill=robot.color, outline="black", width=2, tags="robot"),
+            # Direction indicator (arrow)
+            "arrow": self.canvas.create_line(0, 0, 0, 0, fill="black", width=3, arrow=tk.LAST, tags="robot"),
+            # Robot ID label
+            "label": self.canvas.create_text(0, 0, text=robot.id, font=("Arial", 8), tags="robot"),
+            # Status indicator
+            "status": self.canvas.create_oval(0, 0, 0, 0, outline="black", tags="robot"),
+            # Battery outline and fill
+            "battery_outline": self.canvas.create_rectangle(0, 0, 0, 0, outline="black", tags="robot"),
+            "battery_fill": self.canvas.create_rectangle(0, 0, 0, 0, outline="", tags="robot"),
+        }
+        self.draw_robot(robot)
+
     def draw_robot(self, robot: Robot):
-        """Draw a single robot on canvas"""
+        """Move a single robot's canvas items to its current state"""
+        items = robot.canvas_items
         x, y = robot.x, robot.y
         size = 20
         
         # Robot body (circle)
-        self.canvas.create_oval(x - size, y - size, x + size, y + size, 
-                              fill=robot.color, outline="black", width=2, tags="robot")
+        self.canvas.coords(items["body"], x - size, y - size, x + size, y + size)
         
         # Direction indicator (arrow)
         arrow_length = size * 1.5
-        end_x = x + arrow_length * math.cos(math.radians(robot.angle))
-        end_y = y + arrow_length * math.sin(math.radians(robot.angle))
+        heading = int(robot.angle + 0.5) % 360
+        end_x = x + arrow_length * HEADING_COS[heading]
+        end_y = y + arrow_length * HEADING_SIN[heading]
         
-        self.canvas.create_line(x, y, end_x, end_y, 
-                              fill="black", width=3, arrow=tk.LAST, tags="robot")
+        self.canvas.coords(items["arrow"], x, y, end_x, end_y)
         
         # Robot ID label
-        self.canvas.create_text(x, y + size + 15, text=robot.id, 
-                              font=("Arial", 8), tags="robot")
+        self.canvas.coords(items["label"], x, y + size + 15)
         
         # Status indicator
         status_color = {
@@ -552,8 +894,8 @@ class RobotSimulation:
             "video_call": "blue"
         }.get(robot.status, "gray")
         
-        self.canvas.create_oval(x + size - 5, y - size + 5, x + size + 5, y - size + 15,
-                              fill=status_color, outline="black", tags="robot")
+        self.canvas.coords(items["status"], x + size - 5, y - size + 5, x + size + 5, y - size + 15)
+        self.canvas.itemconfig(items["status"], fill=status_color)
         
         # Battery indicator
         battery_width = 30
@@ -562,18 +904,17 @@ class RobotSimulation:
         battery_y = y - size - 20
         
         # Battery outline
-        self.canvas.create_rectangle(battery_x, battery_y, 
-                                   battery_x + battery_width, battery_y + battery_height,
-                                   outline="black", tags="robot")
+        self.canvas.coords(items["battery_outline"], battery_x, battery_y,
+                           battery_x + battery_width, battery_y + battery_height)
         
-        # Battery fill
+        # Battery fill (hidden once the battery is empty)
         fill_width = int(battery_width * (robot.battery_level / 100))
         battery_color = "green" if robot.battery_level > 50 else "orange" if robot.battery_level > 20 else "red"
         
-        if fill_width > 0:
-            self.canvas.create_rectangle(battery_x, battery_y,
-                                       battery_x + fill_width, battery_y + battery_height,
-                                       fill=battery_color, outline="", tags="robot")
+        self.canvas.coords(items["battery_fill"], battery_x, battery_y,
+                           battery_x + fill_width, battery_y + battery_height)
+        self.canvas.itemconfig(items["battery_fill"], fill=battery_color,
+                               state=tk.NORMAL if fill_width > 0 else tk.HIDDEN)
         
     def run(self):
         """Run the simulation"""
@@ -582,7 +923,10 @@ class RobotSimulation:
         
     def on_closing(self):
         """Handle application closing"""
-        self.running = False
+        self.stop_simulation()
+        if self.connect_executor is not None:
+            # Drop connections still waiting for a worker
+            self.connect_executor.shutdown(wait=False, cancel_futures=True)
         self.disconnect_all_robots()
         # Give a small delay for threads to terminate
         time.sleep(0.1) 
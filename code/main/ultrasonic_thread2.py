@@ -2,12 +2,17 @@
 import RPi.GPIO as GPIO
 import time
 import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
 import signal
 import sys
 
 # GPIO pin pairs for two sensors: (TRIG, ECHO)
 SENSORS = [(5, 6), (24, 25)]  # Sensor 1 (front), Sensor 2 (back)
 
+# Number of (front, back) samples in the distance ring, a power of two
+DISTANCE_RING_SIZE = 8
+
 # Global flag for graceful shutdown
 running = True
 
@@ -67,7 +72,36 @@ def measure_single_distance(trig_pin, echo_pin, sensor_id):
         print(f"⚠️ Error measuring distance from sensor {sensor_id}: {e}")
         return 400  # Return safe max distance on error
 
-def measure_distance(shared_distances):
+def create_distance_ring():
+    """
+    Create the shared ring the sensor process publishes distances through
+
+    Returns:
+        ring_shm: SharedMemory backing the ring, to be unlinked by its creator
+        ring: (DISTANCE_RING_SIZE, 2) float64 view of ring_shm, one (front, back) sample per row
+        ring_tail: RawValue counting the samples written so far
+        new_sample: Event set after every sample
+    """
+    ring_shm = SharedMemory(create=True, size=DISTANCE_RING_SIZE * 2 * 8)
+    ring = np.ndarray((DISTANCE_RING_SIZE, 2), dtype=np.float64, buffer=ring_shm.buf)
+    ring[:] = 100.0
+    ring_tail = multiprocessing.RawValue('Q', 0)
+    new_sample = multiprocessing.Event()
+    return ring_shm, ring, ring_tail, new_sample
+
+def publish_distances(ring, ring_tail, new_sample, distances):
+    """Write one (front, back) sample into the ring and wake the reader"""
+    # Single producer: the row is filled before the tail moves past it,
+    # so the reader never sees a half-written sample
+    ring[ring_tail.value % DISTANCE_RING_SIZE] = distances
+    ring_tail.value += 1
+    new_sample.set()
+
+def latest_slot(ring_tail):
+    """Return the ring row of the newest (front, back) sample"""
+    return (ring_tail.value - 1) % DISTANCE_RING_SIZE
+
+def measure_distance(ring, ring_tail, new_sample):
     """Main function to continuously measure distances from all sensors"""
     global running
     
@@ -82,6 +116,7 @@ def measure_distance(shared_distances):
         
         consecutive_errors = 0
         max_consecutive_errors = 10
+        distances = [100.0, 100.0]  # Latest [front, back]
         
         while running:
             try:
@@ -91,8 +126,9 @@ def measure_distance(shared_distances):
                         
                     distance = measure_single_distance(TRIG, ECHO, i+1)
                     
-                    # Update shared distance array
-                    shared_distances[i] = distance
+                    # Publish the new reading together with the other sensor's latest
+                    distances[i] = distance
+                    publish_distances(ring, ring_tail, new_sample, distances)
                     
                     # Only print occasionally to reduce spam
                     if time.time() % 2 < 0.1:  # Print roughly every 2 seconds
@@ -133,11 +169,12 @@ if __name__ == "__main__":
     import multiprocessing
     
     print("🧪 Testing ultrasonic sensors independently...")
-    shared_distances = multiprocessing.Array('d', [100.0, 100.0])
+    ring_shm, ring, ring_tail, new_sample = create_distance_ring()
     
     try:
-        measure_distance(shared_distances)
+        measure_distance(ring, ring_tail, new_sample)
     except KeyboardInterrupt:
         print("\n🛑 Test stopped by user")
     finally:
-        cleanup_gpio()
\ No newline at end of file
+        cleanup_gpio()
+        ring_shm.unlink()
\ No newline at end of file
@@ -34,6 +34,13 @@ ice_servers = [
 
 config = RTCConfiguration(iceServers=ice_servers)
 
+# Resources of the current call, released by close_call()
+pc = None
+audio_handler = None
+video_track = None
+audio_track = None
+candidate_watch = None
+
 class PiCameraVideoTrack(VideoStreamTrack):
     kind = "video"
     def __init__(self):
@@ -41,6 +48,14 @@ class PiCameraVideoTrack(VideoStreamTrack):
         self.picam2 = Picamera2()
         self.picam2.start()
 
+    def stop(self):
+        """Release the camera so the next call can open it"""
+        super().stop()
+        if self.picam2:
+            self.picam2.stop()
+            self.picam2.close()
+            self.picam2 = None
+
     async def recv(self):
         pts, time_base = await self.next_timestamp()
         frame = self.picam2.capture_array()
@@ -93,6 +108,14 @@ class MicrophoneAudioTrack(MediaStreamTrack):
         )
         self.stream.start()
 
+    def stop(self):
+        """Close the microphone stream so the next call can open it"""
+        super().stop()
+        if self.stream:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
     async def recv(self):
         try:
             # Use wait_for to prevent indefinite blocking
@@ -368,7 +391,7 @@ async def play_audio_track(track):
             audio_handler.stop()
 
 async def main(call_id):
-    global pc
+    global pc, video_track, audio_track, candidate_watch
 
     if not firebase_admin._apps:
         cred = credentials.Certificate('serviceAccountKey.json')
@@ -436,7 +459,7 @@ async def main(call_id):
                 }
                 asyncio.run_coroutine_threadsafe(pc.addIceCandidate(candidate_dict), loop)
 
-    offer_candidates_ref.on_snapshot(on_snapshot)
+    candidate_watch = offer_candidates_ref.on_snapshot(on_snapshot)
 
     print("[✓] WebRTC connection established")
     
@@ -446,6 +469,73 @@ async def main(call_id):
     except asyncio.CancelledError:
         pass
 
+async def close_call():
+    """Close the peer connection and release the camera, microphone and speaker"""
+    global pc, audio_handler, video_track, audio_track, candidate_watch
+    if candidate_watch:
+        candidate_watch.unsubscribe()
+        candidate_watch = None
+    if pc:
+        print("[x] Closing peer connection")
+        await pc.close()
+        pc = None
+    for track in (video_track, audio_track):
+        if track:
+            track.stop()
+    video_track = audio_track = None
+    if audio_handler:
+        audio_handler.stop()
+        audio_handler = None
+
+async def run_daemon():
+    """
+    Serve calls one after another in this process, so the interpreter and the
+    WebRTC/camera imports are paid once instead of on every call.
+
+    Commands arrive on stdin, one JSON object per line:
+        {"action": "start", "callId": "..."}
+        {"action": "stop"}
+    """
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+    call_task = None
+    print("[✓] Video call manager ready")
+
+    while True:
+        line = await reader.readline()
+        if not line:  # stdin closed, the robot control process is gone
+            break
+
+        try:
+            command = json.loads(line)
+        except json.JSONDecodeError:
+            print(f"[x] Ignoring invalid command: {line!r}")
+            continue
+
+        action = command.get("action")
+        if action == "start" and command.get("callId"):
+            if call_task and not call_task.done():
+                print("[x] A call is already running, ignoring start")
+                continue
+            await close_call()  # Leftovers of a call that ended on its own
+            print(f"Starting WebRTC receiver for call ID: {command['callId']}")
+            call_task = asyncio.create_task(main(command["callId"]))
+
+        elif action == "stop":
+            if call_task:
+                call_task.cancel()
+                await asyncio.gather(call_task, return_exceptions=True)
+                call_task = None
+            await close_call()
+            print("[✓] Call stopped")
+
+    if call_task:
+        call_task.cancel()
+        await asyncio.gather(call_task, return_exceptions=True)
+    await close_call()
+
 def terminate_webrtc():
     global pc, audio_handler
     if pc:
@@ -458,9 +548,16 @@ def terminate_webrtc():
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python receiver.py CALL_ID")
+        print("Usage: python receiver.py CALL_ID | --daemon")
         sys.exit(1)
 
+    if sys.argv[1] == "--daemon":
+        try:
+            asyncio.run(run_daemon())
+        except KeyboardInterrupt:
+            print("Video call manager stopped by user")
+        sys.exit(0)
+
     call_id = sys.argv[1]
     print(f"Starting WebRTC receiver for call ID: {call_id}")
     